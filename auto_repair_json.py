@@ -3,6 +3,9 @@ from tkinter import ttk, filedialog, messagebox, font
 import json
 import re
 import os
+import json_backend
+import json_io
+import json_repair
 from typing import Optional, List, Tuple
 from threading import Thread
 import time
@@ -75,6 +78,16 @@ class TextWithLineNumbers(tk.Frame):
         line_end = self.text.index(f"{lineno}.end")
         self.text.tag_add(tag, f"{lineno}.0", line_end)
         self.line_numbers.tag_add(tag, f"{lineno}.0", f"{lineno}.end")
+    def highlight_lines(self, first: int, last: int, tag: str):
+        """Highlights lines `first` through `last` (inclusive) in both widgets."""
+        self.text.tag_add(tag, f"{first}.0", f"{last}.end")
+        self.line_numbers.tag_add(tag, f"{first}.0", f"{last}.end")
+    def highlight_span(self, start: int, end: int, tag: str):
+        """Highlights a character range in the text and its lines in the line numbers."""
+        first = self.text.index(f"1.0 + {start} chars")
+        last = self.text.index(f"1.0 + {end} chars")
+        self.text.tag_add(tag, first, last)
+        self.line_numbers.tag_add(tag, f"{first.split('.')[0]}.0", f"{last.split('.')[0]}.end")
     def clear_highlight(self, tag: str):
         """Removes all instances of a tag from both widgets."""
         self.text.tag_remove(tag, "1.0", tk.END)
@@ -90,6 +103,15 @@ class TextWithLineNumbers(tk.Frame):
         self.text.config(background=bg, foreground=fg, insertbackground=insert_fg)
         self.line_numbers.config(background=ln_bg, foreground=ln_fg)
         self.config(bg=ln_bg) # Frame background
+SAVE_FORMATS = ("Pretty", "Compact", "Sorted keys")
+RENDER_SLICE_MS = 30  # time budget per `after` tick when filling the output pane or tree
+JSON_OPEN_TYPES = [("JSON Files", "*.json"), ("Compressed JSON", "*.gz;*.bz2;*.xz;*.zst"), ("All Files", "*.*")]
+# Compact mode keeps the document as a json_tape.Tape instead of Python objects.
+COMPACT_AUTO_CHARS = 50_000_000  # documents at least this long always use it
+COMPACT_OUTPUT_CHARS = 2_000_000  # output pane shows this much of the text in compact mode
+TAPE_TREE_PAGE = 2000  # members added per expansion of a compact-mode tree node
+MARK_DIFF_LINES = 500  # changed stretches longer than this are marked whole instead of line-diffed
+DIFF_ROWS_LIMIT = 5000  # rows listed in the Diff tab; the status bar reports the full count
 class JSONRepairApp:
     def __init__(self, root):
         self.root = root
@@ -97,10 +119,19 @@ class JSONRepairApp:
         self.root.geometry("1200x700")
         self.root.minsize(900, 600)
         self.current_data = None
+        self.current_tape = None    # set instead of current_data in compact mode
+        self._tape_items = {}       # compact mode: tree item -> tape index (or page marker)
+        self._tape_search = ("", 0)  # compact mode: last query and where to resume it
+        self.rendered_chunks = []   # pretty-printed output of current_data, once complete
+        self.render_complete = False
+        self._render_token = 0
+        self._tree_fill = None      # structure tree items still to insert for current_data
+        self._diff_targets = {}  # Diff tab row -> structure tree item
         self.last_input_time = 0
         self.debounce_delay = 500  # ms
         self.font_size = 10
         self.text_font = font.Font(family="Consolas", size=self.font_size)
+        self.output_text = self.tree = self.tree_menu = self.diff_view = None  # built on first use
         self.create_widgets()
         self.setup_bindings()
         self.setup_styles() # Apply the MIDNIGHT_THEME
@@ -193,19 +224,9 @@ class JSONRepairApp:
         self.input_text_widget.line_numbers.tag_configure("error", 
             background=MIDNIGHT_THEME["diff_bg"], 
             foreground=MIDNIGHT_THEME["fg_text"])
-        self.output_text.config(
-            background=MIDNIGHT_THEME["bg_output"], 
-            foreground=MIDNIGHT_THEME["fg_text"],
-            insertbackground=MIDNIGHT_THEME["fg_text"]
-        )
-        self.tree_menu.config(
-            bg=MIDNIGHT_THEME["btn_refresh_bg"],
-            fg=MIDNIGHT_THEME["fg_text"],
-            activebackground=MIDNIGHT_THEME["btn_copy_bg"],
-            activeforeground=MIDNIGHT_THEME["fg_text"],
-            relief=tk.FLAT,
-            borderwidth=0
-        )
+        self.input_text.tag_configure("diff", background=MIDNIGHT_THEME["bg_output"],
+                                      foreground=MIDNIGHT_THEME["diff_bg"])
+        self.input_text_widget.line_numbers.tag_configure("diff", foreground=MIDNIGHT_THEME["diff_bg"])
         self.status_bar.config(
             background=MIDNIGHT_THEME["bg_main"],
             foreground=MIDNIGHT_THEME["fg_label"],
@@ -217,14 +238,20 @@ class JSONRepairApp:
         toolbar.pack(fill=tk.X, padx=10, pady=(5, 0))
         ttk.Button(toolbar, text="Load File", command=self.load_file, style='Browse.TButton').pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Save Fixed", command=self.save_file, style='Save.TButton').pack(side=tk.LEFT, padx=2)
+        self.save_format = tk.StringVar(value="Pretty")
+        ttk.Combobox(toolbar, textvariable=self.save_format, values=SAVE_FORMATS, state="readonly",
+                     width=11).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Auto Repair", command=self.trigger_auto_repair, style='Refresh.TButton').pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Clear", command=self.clear_all, style='Refresh.TButton').pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Compare…", command=self.compare_file, style='Browse.TButton').pack(side=tk.LEFT, padx=2)
+        self.compact_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(toolbar, text="Compact", variable=self.compact_var).pack(side=tk.LEFT, padx=6)
         self.search_var = tk.StringVar()
         search_entry = ttk.Entry(toolbar, textvariable=self.search_var, width=20)
         search_entry.pack(side=tk.RIGHT, padx=2)
         search_entry.bind("<Return>", lambda e: self.search_tree())
         ttk.Button(toolbar, text="Search", command=self.search_tree, style='Copy.TButton').pack(side=tk.RIGHT, padx=2)
-        notebook = ttk.Notebook(self.root)
+        self.notebook = notebook = ttk.Notebook(self.root)
         notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=(5, 10))
         input_tab_frame = ttk.Frame(notebook, style='TFrame')
         notebook.add(input_tab_frame, text="  Input  ")
@@ -239,9 +266,37 @@ class JSONRepairApp:
         input_scroll_x = ttk.Scrollbar(input_tab_frame, orient=tk.HORIZONTAL, command=self.input_text.xview)
         input_scroll_x.pack(fill=tk.X, side=tk.BOTTOM, padx=5, pady=(0,5))
         self.input_text.config(xscrollcommand=input_scroll_x.set)
-        output_tab_frame = ttk.Frame(notebook, style='TFrame')
-        notebook.add(output_tab_frame, text="  Output & Tree  ")
-        paned = ttk.PanedWindow(output_tab_frame, orient=tk.HORIZONTAL)
+        self.output_tab = output_tab_frame = ttk.Frame(notebook, style='TFrame')
+        notebook.add(output_tab_frame, text="  Output & Tree  ")  # filled in by ensure_output_tab
+        notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        self.diff_tab = ttk.Frame(notebook, style='TFrame')
+        notebook.add(self.diff_tab, text="  Diff  ")  # filled in by ensure_diff_tab
+        self.status = tk.StringVar(value="Ready")
+        self.status_bar = ttk.Label(self.root, textvariable=self.status, anchor=tk.W)
+        self.status_bar.pack(fill=tk.X, side=tk.BOTTOM, padx=10, pady=(0, 5))
+    def ensure_diff_tab(self):
+        """Builds the Diff tab's change list when it is first shown or filled."""
+        if self.diff_view is not None:
+            return
+        diff_frame = ttk.LabelFrame(self.diff_tab, text="Structural Changes (current → compared file)")
+        diff_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.diff_view = ttk.Treeview(diff_frame, columns=("op", "path", "detail"), show="headings")
+        for col, width in (("op", 80), ("path", 360), ("detail", 600)):
+            self.diff_view.heading(col, text=col.capitalize())
+            self.diff_view.column(col, width=width, stretch=col == "detail")
+        self.diff_view.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
+        diff_scroll = ttk.Scrollbar(diff_frame, orient=tk.VERTICAL, command=self.diff_view.yview)
+        diff_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.diff_view.config(yscrollcommand=diff_scroll.set)
+        self.diff_view.bind("<<TreeviewSelect>>", self.on_diff_select)
+        for op, colour in (("added", "btn_refresh_fg"), ("removed", "diff_bg"), ("changed", "btn_browse_fg")):
+            self.diff_view.tag_configure(op, foreground=MIDNIGHT_THEME[colour])
+    def ensure_output_tab(self):
+        """Builds the output pane and structure tree the first time they are
+        needed (shown, or given a document), so startup skips them."""
+        if self.output_text is not None:
+            return
+        paned = ttk.PanedWindow(self.output_tab, orient=tk.HORIZONTAL)
         paned.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         output_pane_frame = ttk.Frame(paned, style='TFrame')
         paned.add(output_pane_frame, weight=3)
@@ -263,6 +318,18 @@ class JSONRepairApp:
         tree_scroll = ttk.Scrollbar(right_frame, orient=tk.VERTICAL, command=self.tree.yview)
         tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         self.tree.config(yscrollcommand=tree_scroll.set)
+        self.tree.bind("<Button-3>", self.on_tree_context)  # Right-click
+        self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
+        self.tree.bind("<<TreeviewOpen>>", self.on_tree_open)
+        self.tree.tag_configure("diff", background=MIDNIGHT_THEME["diff_bg"])
+        self.output_text.config(
+            background=MIDNIGHT_THEME["bg_output"], 
+            foreground=MIDNIGHT_THEME["fg_text"],
+            insertbackground=MIDNIGHT_THEME["fg_text"]
+        )
+    def ensure_tree_menu(self):
+        if self.tree_menu is not None:
+            return self.tree_menu
         self.tree_menu = tk.Menu(self.root, tearoff=0)
         self.tree_menu.add_command(label="Copy JSON Path", command=self.tree_copy_path)
         self.tree_menu.add_command(label="Copy Value", command=self.tree_copy_value)
@@ -270,11 +337,20 @@ class JSONRepairApp:
         self.tree_menu.add_separator()
         self.tree_menu.add_command(label="Expand All", command=self.tree_expand_all)
         self.tree_menu.add_command(label="Collapse All", command=self.tree_collapse_all)
-        self.tree.bind("<Button-3>", self.on_tree_context)  # Right-click
-        self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
-        self.status = tk.StringVar(value="Ready")
-        self.status_bar = ttk.Label(self.root, textvariable=self.status, anchor=tk.W)
-        self.status_bar.pack(fill=tk.X, side=tk.BOTTOM, padx=10, pady=(0, 5))
+        self.tree_menu.config(
+            bg=MIDNIGHT_THEME["btn_refresh_bg"],
+            fg=MIDNIGHT_THEME["fg_text"],
+            activebackground=MIDNIGHT_THEME["btn_copy_bg"],
+            activeforeground=MIDNIGHT_THEME["fg_text"],
+            relief=tk.FLAT,
+            borderwidth=0
+        )
+        return self.tree_menu
+    def on_tab_changed(self, _):
+        if self.notebook.select() == str(self.output_tab):
+            self.ensure_output_tab()
+        elif self.notebook.select() == str(self.diff_tab):
+            self.ensure_diff_tab()
     def setup_bindings(self):
         self.input_text.bind("<KeyRelease>", self.on_input_change)
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
@@ -291,7 +367,8 @@ class JSONRepairApp:
     def update_font_size(self):
         self.text_font.configure(size=self.font_size)
         self.input_text_widget.update_font(self.text_font)
-        self.output_text.config(font=self.text_font)
+        if self.output_text is not None:
+            self.output_text.config(font=self.text_font)
     def increase_font(self, event=None):
         self.font_size = min(30, self.font_size + 1)
         self.update_font_size()
@@ -307,90 +384,104 @@ class JSONRepairApp:
             self.decrease_font()
         return "break"
     def _get_parse_error(self, s: str) -> Optional[json.JSONDecodeError]:
-        """Tries to parse a string, returns the error if it fails."""
-        try:
-            json.loads(s)
-            return None
-        except json.JSONDecodeError as e:
-            return e
-        except Exception:
-            return None 
-    def _strip_json_comments(self, s: str) -> str:
-        pattern = re.compile(r'("(?:\\.|[^"\\])*")|(//.*)|(/\*[\s\S]*?\*/)', re.DOTALL)
-        return pattern.sub(lambda m: m.group(1) or "", s)
-    def _normalize_single_quotes(self, s: str) -> str:
-        def repl(m):
-            if m.group(1): return m.group(1) 
-            inner = m.group(2)[1:-1]
-            inner = inner.replace('\\"', '"').replace("\\'", "'") 
-            inner = inner.replace('"', '\\"')
-            return f'"{inner}"'
-        pattern = re.compile(r'("(?:\\.|[^"\\])*")|(\'(?:\\.|[^\'\\])*\')')
-        return pattern.sub(repl, s)
-    def _remove_trailing_commas(self, s: str) -> str:
-        return re.sub(r',\s*([\]}])', r'\1', s)
-    def _quote_unquoted_keys(self, s: str) -> str:
-        return re.sub(r'(?<=[\{\,])\s*([a-zA-Z_][a-zA-Z0-9_\-]*)\s*(?=:)', r' "\1"', s)
-    def _fix_keywords(self, s: str) -> str:
-        """Converts Python None/True/False to JSON null/true/false."""
-        s = re.sub(r'\bNone\b', 'null', s)
-        s = re.sub(r'\bTrue\b', 'true', s)
-        s = re.sub(r'\bFalse\b', 'false', s)
-        return s
-    def _fix_nan_inf(self, s: str) -> str:
-        """Converts NaN/Infinity to null."""
-        return re.sub(r'\b(NaN|Infinity|-Infinity)\b', 'null', s)
-    def repair_pipeline(self, text: str) -> Tuple[Optional[str], List[str]]:
-        report = []
-        if not self._get_parse_error(text):
-            return text, ["already valid"]
-        steps = [
-            (self._fix_keywords, "fixed Python keywords (None/True/False)"),
-            (self._fix_nan_inf, "converted NaN/Infinity to null"),
-            (self._strip_json_comments, "removed comments"),
-            (self._normalize_single_quotes, "normalized single quotes"),
-            (self._remove_trailing_commas, "removed trailing commas"),
-            (self._quote_unquoted_keys, "quoted unquoted keys"),
-        ]
-        current = text
-        for func, msg in steps:
-            candidate = func(current)
-            if not self._get_parse_error(candidate):
-                report.append(msg)
-                return candidate, report 
-            elif candidate != current:
-                report.append(msg)
-                current = candidate 
-        if not self._get_parse_error(current):
-             return current, report
-        stripped = current.strip()
-        if not stripped.startswith(('{', '[')) and re.search(r"^\s*[a-zA-Z_]", stripped, re.M):
-            wrapped = "{\n" + stripped + "\n}"
-            if not self._get_parse_error(wrapped):
-                report.append("wrapped in {}")
-                return wrapped, report
-        return None, []
+        return json_repair.parse_error(s)
+    def repair_pipeline(self, text: str, parsed: Optional[list] = None,
+                        compact: bool = False) -> Tuple[Optional[str], List[str]]:
+        # compact mode keeps only the text, so validation builds no document
+        return json_repair.repair_pipeline(text, parsed, check=json_repair.scan_error if compact else None)
+    def show_data(self, parsed):
+        """Streams parsed data into the output pane, then fills the tree in the
+        same time slices (at once if the tree is searched or expanded first)."""
+        self.ensure_output_tab()
+        self.current_data = parsed
+        self.current_tape = None
+        self.rendered_chunks = []
+        self.render_complete = False
+        self._render_token += 1
+        self.output_text.config(state=tk.NORMAL)
+        self.output_text.delete("1.0", tk.END)
+        self.output_text.config(state=tk.DISABLED)
+        self.clear_diff()
+        self.populate_tree(parsed)
+        self._feed_output(json_backend.iter_dumps(parsed, indent=2), self._render_token)
+    def show_tape(self, tape: "json_tape.Tape"):
+        """Compact mode: shows the document from its token tape. The output pane
+        holds the text as-is (up to COMPACT_OUTPUT_CHARS) and the tree is built
+        as nodes are expanded."""
+        self.ensure_output_tab()
+        self.current_data = None
+        self.current_tape = tape
+        self.rendered_chunks = []
+        self.render_complete = False
+        self._render_token += 1
+        self.clear_diff()
+        self.output_text.config(state=tk.NORMAL)
+        self.output_text.delete("1.0", tk.END)
+        self.output_text.insert("1.0", tape.text[:COMPACT_OUTPUT_CHARS])
+        if len(tape.text) > COMPACT_OUTPUT_CHARS:
+            self.output_text.insert(tk.END, f"\n… {len(tape.text) - COMPACT_OUTPUT_CHARS:,} more characters not shown")
+        self.output_text.config(state=tk.DISABLED)
+        self.populate_tape_tree(tape)  # no syntax highlighting: too slow at these sizes
+    def _feed_output(self, chunks, token):
+        """Appends pretty-printed chunks for one time slice, then yields to Tk."""
+        if token != self._render_token:
+            return  # superseded by a newer document or cleared
+        deadline = time.perf_counter() + RENDER_SLICE_MS / 1000
+        self.output_text.config(state=tk.NORMAL)
+        for chunk in chunks:
+            self.rendered_chunks.append(chunk)
+            self.output_text.insert(tk.END, chunk)
+            if time.perf_counter() >= deadline:
+                self.output_text.config(state=tk.DISABLED)
+                self.root.after(1, self._feed_output, chunks, token)
+                return
+        self.output_text.config(state=tk.DISABLED)
+        self.render_complete = True
+        self.apply_syntax_highlighting()
+        self.root.after(1, self._feed_tree, token)
+    def _feed_tree(self, token):
+        """Inserts structure tree items for one time slice, then yields to Tk."""
+        if token != self._render_token or self._tree_fill is None:
+            return
+        deadline = time.perf_counter() + RENDER_SLICE_MS / 1000
+        for _ in self._tree_fill:
+            if time.perf_counter() >= deadline:
+                self.root.after(1, self._feed_tree, token)
+                return
+        self._tree_fill = None
+    def finish_tree(self):
+        """Inserts whatever is left of the structure tree, for callers that need all of it."""
+        if self._tree_fill is not None:
+            for _ in self._tree_fill:
+                pass
+            self._tree_fill = None
     def auto_repair(self):
         self.input_text_widget.clear_highlight("error")
-        raw = self.input_text.get("1.0", tk.END).strip()
+        self.input_text_widget.clear_highlight("diff")
+        full = self.input_text.get("1.0", "end-1c")
+        lead = re.match(r"\s*", full).end()
+        raw = full.strip()  # the same string when there is nothing to strip
+        del full
         if not raw:
             return
-        repaired, report = self.repair_pipeline(raw)
+        compact = self.compact_var.get() or len(raw) >= COMPACT_AUTO_CHARS
+        parsed = []  # the pipeline's successful parse, reused below
+        repaired, report = self.repair_pipeline(raw, parsed, compact=compact)
         if repaired:
             try:
-                parsed = json.loads(repaired)
-                pretty = json.dumps(parsed, indent=2, ensure_ascii=False)
-                self.output_text.config(state=tk.NORMAL)
-                self.output_text.delete("1.0", tk.END)
-                self.output_text.insert("1.0", pretty)
-                self.output_text.config(state=tk.DISABLED)
-                self.current_data = parsed
-                self.populate_tree(parsed)
+                if compact:
+                    import json_tape  # compact mode only
+                    self.show_tape(json_tape.Tape(repaired))
+                    report = report + ["compact mode"]
+                else:
+                    self.show_data(parsed.pop())
+                self.mark_repaired_lines(raw, repaired, lead=lead)
                 self.log(f"Auto-repair success: {', '.join(report)}")
-                self.apply_syntax_highlighting()
                 return
             except Exception as e:
                 self.log(f"Post-repair parse failed: {e}")
+        if self.salvage_input(raw, lead=lead):
+            return
         self.log("Auto-repair failed. Checking for error...", duration=0)
         error = self._get_parse_error(raw) 
         if error:
@@ -398,6 +489,139 @@ class JSONRepairApp:
             self.log(f"Auto-repair failed: {error.msg} (line {error.lineno}, col {error.colno})", duration=5000)
         else:
             self.log("Auto-repair failed. Could not parse input.")
+    def salvage_input(self, raw: str, lead: int = 0) -> bool:
+        """Falls back to the error-tolerant reader: shows every record that
+        survives and highlights the quarantined spans in the input."""
+        from json_recover import salvage  # only needed for input the pipeline cannot repair
+        result = salvage(raw)
+        if not result.records:
+            return False
+        self.show_data(result.document)
+        for start, end in result.quarantined:
+            self.input_text_widget.highlight_span(lead + start, lead + end, "error")
+        self.log(f"Input is corrupt: salvaged {len(result.records)} record(s), "
+                 f"quarantined {len(result.quarantined)} span(s)", duration=5000)
+        return True
+    def mark_repaired_lines(self, raw: str, repaired: str, lead: int = 0):
+        """Highlights the input lines that the repair pipeline rewrote. Runs on
+        every auto-repair, so the work stays linear: unchanged leading and
+        trailing lines are trimmed first, only a short changed middle is
+        line-diffed, and huge documents are not marked at all."""
+        self.input_text_widget.clear_highlight("diff")
+        if raw == repaired or len(raw) >= COMPACT_AUTO_CHARS:
+            return
+        first = self.input_text.get("1.0", f"1.0 + {lead} chars").count("\n") + 1
+        before, after = raw.split("\n"), repaired.split("\n")
+        if len(before) == len(after):
+            changed = [i for i, (x, y) in enumerate(zip(before, after)) if x != y]
+        else:
+            lo, end_b, end_a = 0, len(before), len(after)
+            while lo < end_b and lo < end_a and before[lo] == after[lo]:
+                lo += 1
+            while end_b > lo and end_a > lo and before[end_b - 1] == after[end_a - 1]:
+                end_b -= 1
+                end_a -= 1
+            if end_b - lo > MARK_DIFF_LINES or end_a - lo > MARK_DIFF_LINES:
+                changed = list(range(lo, max(end_b, lo + 1)))
+            else:
+                import difflib  # only needed when a repair changed the line count
+                changed = []
+                matcher = difflib.SequenceMatcher(None, before[lo:end_b], after[lo:end_a], autojunk=False)
+                for tag, i1, i2, _, _ in matcher.get_opcodes():
+                    if tag != "equal":
+                        changed.extend(range(lo + i1, lo + max(i2, i1 + 1)))
+        last = len(before) - 1
+        run_start = prev = None
+        for i in changed:  # consecutive lines are tagged as one range
+            i = min(i, last)
+            if prev is not None and i <= prev + 1:
+                prev = i
+                continue
+            if prev is not None:
+                self.input_text_widget.highlight_lines(first + run_start, first + prev, "diff")
+            run_start = prev = i
+        if prev is not None:
+            self.input_text_widget.highlight_lines(first + run_start, first + prev, "diff")
+    def compare_file(self):
+        if self.current_data is None and self.current_tape is None:
+            messagebox.showwarning("No Data", "Load or repair a document before comparing.")
+            return
+        path = filedialog.askopenfilename(filetypes=JSON_OPEN_TYPES)
+        if not path:
+            return
+        try:
+            other = json_backend.loads(json_io.read_text(path))
+        except Exception as e:
+            messagebox.showerror("Error Loading File", f"Could not read JSON from file:\n{e}")
+            self.log("Compare failed")
+            return
+        import json_diff  # only needed once a comparison is made
+        started = time.perf_counter()
+        current = self.current_data if self.current_tape is None else self.current_tape.value()
+        changes = json_diff.diff(current, other)
+        elapsed = time.perf_counter() - started
+        self.show_diff(changes)
+        if changes:
+            self.log(f"{len(changes)} change(s) vs {os.path.basename(path)} ({elapsed:.2f}s)", duration=5000)
+        else:
+            self.log(f"No differences vs {os.path.basename(path)} ({elapsed:.2f}s)", duration=5000)
+    def show_diff(self, changes: List["json_diff.Change"]):
+        """Lists changes in the Diff tab and marks the affected structure tree items."""
+        import json_diff
+        self.ensure_diff_tab()
+        self.clear_diff()
+        for change in changes[:DIFF_ROWS_LIMIT]:
+            target = self._tree_item_for_path(change.path) if self.current_tape is None else None
+            if target:
+                self.tree.item(target, tags=("diff",))
+            row = self.diff_view.insert("", "end", values=(change.op, change.path, json_diff.format_detail(change)),
+                                        tags=(change.op,))
+            self._diff_targets[row] = target
+        if len(changes) > DIFF_ROWS_LIMIT:
+            self.diff_view.insert("", "end", values=("", f"... {len(changes) - DIFF_ROWS_LIMIT} more", ""))
+        self.notebook.select(self.diff_tab)
+    def clear_diff(self):
+        for target in set(self._diff_targets.values()):
+            if target and self.tree.exists(target):
+                self.tree.item(target, tags=())
+        self._diff_targets = {}
+        if self.diff_view is not None:
+            self.diff_view.delete(*self.diff_view.get_children())
+    def _tree_item_for_path(self, path: str):
+        """Structure tree item for a json_diff path into current_data. Paths that
+        only exist in the compared document resolve to their nearest ancestor."""
+        self.finish_tree()
+        roots = self.tree.get_children()
+        if not roots:
+            return None
+        item, value = roots[0], self.current_data
+        for name, index, quoted in re.findall(r'\.([A-Za-z_][A-Za-z0-9_]*)|\[(\d+)\]|\[("(?:[^"\\]|\\.)*")\]', path):
+            if index and isinstance(value, list):
+                position = int(index)
+                if position >= len(value):
+                    break
+                value = value[position]
+            elif isinstance(value, dict):
+                key = name or json.loads(quoted)
+                if key not in value:
+                    break
+                position = next(i for i, k in enumerate(value) if k == key)
+                value = value[key]
+            else:
+                break
+            item = self.tree.get_children(item)[position]
+        return item
+    def on_diff_select(self, _):
+        sel = self.diff_view.selection()
+        target = self._diff_targets.get(sel[0]) if sel else None
+        if target and self.tree.exists(target):
+            self.notebook.select(self.output_tab)
+            parent = self.tree.parent(target)
+            while parent:
+                self.tree.item(parent, open=True)
+                parent = self.tree.parent(parent)
+            self.tree.see(target)
+            self.tree.selection_set(target)
     def trigger_auto_repair(self):
         self.auto_repair()
     def on_input_change(self, event=None):
@@ -439,28 +663,131 @@ class JSONRepairApp:
     def apply_text_tags(self):
         if self.current_data:
             self.apply_syntax_highlighting()
-    def populate_tree(self, data, parent=""):
+    def populate_tree(self, data):
+        """Clears the tree and queues its items for `data`; _feed_tree or
+        finish_tree inserts them."""
         self.tree.delete(*self.tree.get_children())
+        self._tree_fill = self._tree_inserts(data)
+    def _tree_inserts(self, data):
+        """Inserts the tree for `data` depth first, yielding after each item."""
         def insert(node, value, key=""):
             if isinstance(value, dict):
                 node_text = f"{key}: {{...}}" if key else "{...}"
-                nid = self.tree.insert(node, "end", text=node_text, values=("object",))
-                for k, v in value.items():
-                    insert(nid, v, str(k))
-            elif isinstance(value, list):
+                return self.tree.insert(node, "end", text=node_text, values=("object",)), \
+                    ((str(k), v) for k, v in value.items())
+            if isinstance(value, list):
                 node_text = f"{key}: [...]" if key else "[...]"
-                nid = self.tree.insert(node, "end", text=node_text, values=("array",))
-                for i, v in enumerate(value):
-                    insert(nid, v, f"[{i}]")
+                return self.tree.insert(node, "end", text=node_text, values=("array",)), \
+                    ((f"[{i}]", v) for i, v in enumerate(value))
+            display_val = repr(value)
+            if len(display_val) > 40:
+                display_val = display_val[:40] + "..."
+            display = f"{key}: {display_val}" if key else display_val
+            return self.tree.insert(node, "end", text=display, values=("value",)), None
+        root, members = insert("", data)
+        self.tree.item(root, open=True)
+        stack = [(root, members)] if members is not None else []
+        while stack:
+            parent, members = stack[-1]
+            member = next(members, None)
+            if member is None:
+                stack.pop()
+                continue
+            nid, children = insert(parent, member[1], member[0])
+            if children is not None:
+                stack.append((nid, children))
+            yield
+    def populate_tape_tree(self, tape: "json_tape.Tape"):
+        self.tree.delete(*self.tree.get_children())
+        self._tree_fill = None
+        self._tape_items = {}
+        self._tape_search = ("", 0)
+        kind = tape.kind(0)
+        if kind in ("object", "array"):
+            root = self.tree.insert("", "end", text="{...}" if kind == "object" else "[...]", values=(kind,))
+            self._tape_items[root] = 0
+            self._fill_tape_node(root)
+            self.tree.item(root, open=True)
+        else:
+            self.tree.insert("", "end", text=tape.preview(0), values=("value",))
+    def _fill_tape_node(self, parent):
+        """Adds the next TAPE_TREE_PAGE members of a compact-mode container in
+        place of its placeholder or of the "more" item that was selected."""
+        tape = self.current_tape
+        resume = None
+        for child in self.tree.get_children(parent):
+            if self.tree.item(child, "values") in (("placeholder",), ("more",)):
+                resume = self._tape_items.pop(child, None)
+                self.tree.delete(child)
+        start, first = resume if isinstance(resume, tuple) else (None, 0)
+        index = first
+        for key, j in tape.children(self._tape_items[parent], start, first):
+            if index - first >= TAPE_TREE_PAGE:
+                more = self.tree.insert(parent, "end", text=f"… more from member {index:,}", values=("more",))
+                self._tape_items[more] = (j - 1 if isinstance(key, str) else j, index)  # resume token, member number
+                return
+            label = f"[{key}]" if isinstance(key, int) else str(key)
+            kind = tape.kind(j)
+            if kind in ("object", "array"):
+                nid = self.tree.insert(parent, "end", text=f"{label}: {{...}}" if kind == "object" else f"{label}: [...]",
+                                       values=(kind,))
+                self._tape_items[nid] = j
+                if tape.skips[j] - j > 2:  # not empty: shows the expand arrow until filled
+                    self.tree.insert(nid, "end", text="…", values=("placeholder",))
             else:
-                display_val = repr(value)
+                display_val = tape.preview(j)
                 if len(display_val) > 40:
                     display_val = display_val[:40] + "..."
-                display = f"{key}: {display_val}" if key else display_val
-                self.tree.insert(node, "end", text=display, values=("value",))
-        insert(parent, data)
-        for child in self.tree.get_children():
-            self.tree.item(child, open=True)
+                nid = self.tree.insert(parent, "end", text=f"{label}: {display_val}", values=("value",))
+                self._tape_items[nid] = j
+            index += 1
+    def _tape_tree_item(self, parent, j):
+        """Tree item for the member at tape index `j` of compact-mode item
+        `parent`, adding pages of members until it is there."""
+        while True:
+            children = self.tree.get_children(parent)
+            if not children:
+                return None
+            last = self.tree.item(children[-1], "values")
+            if last == ("placeholder",) or last == ("more",) and \
+                    (len(children) < 2 or self._tape_items[children[-2]] < j):
+                self._fill_tape_node(parent)
+                continue
+            return next((c for c in children if self._tape_items.get(c) == j), None)
+    def search_tape(self, query: str):
+        """Compact mode: finds `query` in the document text itself, not just in
+        the tree items built so far, and expands the tree down to the hit.
+        Searching again moves on to the next hit."""
+        tape = self.current_tape
+        pattern = re.compile(re.escape(query), re.IGNORECASE)
+        last_query, resume = self._tape_search
+        start = resume if last_query == query else 0
+        match = pattern.search(tape.text, start) or start and pattern.search(tape.text)
+        if not match:
+            self._tape_search = ("", 0)
+            self.log("Search query not found.")
+            return
+        token = tape.token_at(match.start())
+        end = match.end() if tape.is_container(token) else max(match.end(), tape.span(token)[1])
+        self._tape_search = (query, end)  # one stop per key or value
+        roots = self.tree.get_children()
+        item = roots[0] if roots else None
+        for j in tape.path_to(token):
+            self.tree.item(item, open=True)
+            found = self._tape_tree_item(item, j)
+            if found is None:
+                break
+            item = found
+        if item:
+            self.tree.see(item)
+            self.tree.selection_set(item)
+            self.log(f"Found: {self.tree.item(item, 'text')}")
+    def on_tree_open(self, _):
+        if self.current_tape is None:
+            return
+        iid = self.tree.focus()
+        if iid and any(self.tree.item(c, "values") == ("placeholder",) for c in self.tree.get_children(iid)):
+            self._fill_tape_node(iid)
     def get_tree_path(self, iid):
         path = []
         while iid:
@@ -483,7 +810,7 @@ class JSONRepairApp:
         iid = self.tree.identify_row(event.y)
         if iid:
             self.tree.selection_set(iid)
-            self.tree_menu.tk_popup(event.x_root, event.y_root)
+            self.ensure_tree_menu().tk_popup(event.x_root, event.y_root)
     def tree_copy_path(self):
         sel = self.tree.selection()
         if sel:
@@ -493,6 +820,12 @@ class JSONRepairApp:
             self.log(f"Copied Path: {path}")
     def _get_value_from_path(self, jsonpath: str):
         """Safely get value using simple JSONPath (dot + bracket notation)."""
+        if self.current_tape is not None and jsonpath:
+            try:
+                return self.current_tape.value(self.current_tape.resolve(jsonpath))
+            except (KeyError, IndexError, ValueError):
+                self.log(f"Could not resolve path: {jsonpath}")
+                return None
         if not self.current_data or not jsonpath:
             return None
         value = self.current_data
@@ -525,11 +858,14 @@ class JSONRepairApp:
     def tree_copy_value(self):
         sel = self.tree.selection()
         if sel:
-            path = self.get_tree_path(sel[0])
-            value = self._get_value_from_path(path)
+            idx = self._tape_items.get(sel[0])
+            if self.current_tape is not None and isinstance(idx, int):
+                value = self.current_tape.value(idx)  # decoded from the text, no path lookup
+            else:
+                value = self._get_value_from_path(self.get_tree_path(sel[0]))
             if value is not None:
                 try:
-                    value_str = json.dumps(value, indent=2, ensure_ascii=False)
+                    value_str = json_backend.dumps(value, indent=2)
                 except:
                     value_str = str(value)
                 self.root.clipboard_clear()
@@ -537,10 +873,14 @@ class JSONRepairApp:
                 self.log(f"Copied Value")
     def _tree_recursive_open(self, item, open_state: bool):
         if self.tree.item(item, "values") in [("object",), ("array",)]:
+            if open_state and self.current_tape is not None and \
+                    any(self.tree.item(c, "values") == ("placeholder",) for c in self.tree.get_children(item)):
+                self._fill_tape_node(item)
             self.tree.item(item, open=open_state)
             for child in self.tree.get_children(item):
                 self._tree_recursive_open(child, open_state)
     def tree_expand_all(self):
+        self.finish_tree()
         for item in self.tree.get_children():
             self._tree_recursive_open(item, open_state=True)
     def tree_collapse_all(self):
@@ -550,11 +890,19 @@ class JSONRepairApp:
         sel = self.tree.selection()
         if not sel:
             return
+        if self.current_tape is not None:
+            self.highlight_tape_item(sel[0], flash=False)
+            return
         path = self.get_tree_path(sel[0])
         self.highlight_in_output(path, flash=False)
     def on_tree_select(self, _):
         sel = self.tree.selection()
-        if sel:
+        if sel and self.current_tape is not None:
+            if self.tree.item(sel[0], "values") == ("more",):
+                self._fill_tape_node(self.tree.parent(sel[0]))
+            else:
+                self.highlight_tape_item(sel[0], flash=True)
+        elif sel:
             path = self.get_tree_path(sel[0])
             self.highlight_in_output(path, flash=True)
     def highlight_in_output(self, jsonpath, flash=False):
@@ -582,31 +930,54 @@ class JSONRepairApp:
                 if isinstance(value, (dict, list)):
                     self.log("Cannot highlight complex objects in arrays yet.")
                     return 
-                search_term = json.dumps(value, ensure_ascii=False)
+                search_term = json_backend.dumps(value, compact=True)
                 end_len = len(search_term)
             if not search_term:
                 return
             start = text_widget.search(search_term, "1.0")
             if start:
-                end = f"{start} + {end_len} chars"
-                text_widget.see(start)
-                if flash:
-                    tag = "flash"
-                    text_widget.tag_add(tag, start, end)
-                    flash_bg = MIDNIGHT_THEME["btn_browse_fg"]
-                    flash_fg = MIDNIGHT_THEME["bg_main"]
-                    text_widget.tag_config(tag, background=flash_bg, foreground=flash_fg)
-                    self.root.after(800, lambda: text_widget.tag_remove(tag, "1.0", tk.END))
-                else:
-                    text_widget.tag_add(tk.SEL, start, end)
-                    text_widget.focus_set()
+                self._mark_output_range(start, f"{start} + {end_len} chars", flash)
         except Exception as e:
             print(f"Highlight error: {e}")
             pass
+    def highlight_tape_item(self, iid, flash=False):
+        """Compact mode: the output pane holds the original text, so a tree
+        item's exact location comes straight from its tape offsets."""
+        tape = self.current_tape
+        idx = self._tape_items.get(iid)
+        if not isinstance(idx, int):
+            return
+        start, end = tape.span(idx)
+        parent = self._tape_items.get(self.tree.parent(iid))
+        if isinstance(parent, int) and tape.kind(parent) == "object":
+            start = tape.offsets[idx - 1]  # include the member's key
+        if end > COMPACT_OUTPUT_CHARS:
+            self.log("Item lies beyond the part of the document shown in the output pane.")
+            return
+        self.output_text.tag_remove("flash", "1.0", tk.END)
+        self._mark_output_range(f"1.0 + {start} chars", f"1.0 + {end} chars", flash)
+    def _mark_output_range(self, start, end, flash):
+        text_widget = self.output_text
+        text_widget.see(start)
+        if flash:
+            tag = "flash"
+            text_widget.tag_add(tag, start, end)
+            flash_bg = MIDNIGHT_THEME["btn_browse_fg"]
+            flash_fg = MIDNIGHT_THEME["bg_main"]
+            text_widget.tag_config(tag, background=flash_bg, foreground=flash_fg)
+            self.root.after(800, lambda: text_widget.tag_remove(tag, "1.0", tk.END))
+        else:
+            text_widget.tag_add(tk.SEL, start, end)
+            text_widget.focus_set()
     def search_tree(self):
         query = self.search_var.get().lower()
         if not query:
             return
+        self.ensure_output_tab()
+        if self.current_tape is not None:
+            self.search_tape(query)
+            return
+        self.finish_tree()
         def recursive_search(item):
             if query in self.tree.item(item, "text").lower():
                 return item
@@ -627,11 +998,10 @@ class JSONRepairApp:
         if not found_item:
             self.log("Search query not found.")
     def load_file(self):
-        path = filedialog.askopenfilename(filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")])
+        path = filedialog.askopenfilename(filetypes=JSON_OPEN_TYPES)
         if path:
             try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                content = json_io.read_text(path)
                 self.input_text.delete("1.0", tk.END)
                 self.input_text.insert("1.0", content)
                 self.log(f"Loaded: {os.path.basename(path)}")
@@ -640,26 +1010,46 @@ class JSONRepairApp:
                 messagebox.showerror("Error Loading File", f"Could not read file:\n{e}")
                 self.log("File load error")
     def save_file(self):
-        if not self.current_data:
+        if not self.current_data and self.current_tape is None:
             messagebox.showwarning("No Data", "No valid JSON to save.")
             return
-        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")])
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=json_io.filetypes("JSON Files", ".json"))
         if path:
+            fmt = self.save_format.get()
+            if self.current_tape is not None:
+                chunks = [self.current_tape.text]  # compact mode saves the repaired text as it is
+                if fmt != "Pretty":
+                    self.log(f"Compact mode: saving the text unchanged, '{fmt}' ignored")
+            elif fmt == "Pretty" and self.render_complete:
+                chunks = self.rendered_chunks  # already serialized for the output pane
+            else:
+                chunks = json_backend.iter_dumps(self.current_data, indent=2,
+                                                 compact=fmt == "Compact", sort_keys=fmt == "Sorted keys")
             try:
-                with open(path, 'w', encoding='utf-8') as f:
-                    json.dump(self.current_data, f, indent=2, ensure_ascii=False)
+                with json_io.open_text(path, 'w') as f:  # compressed for .gz/.bz2/.xz/.zst
+                    f.writelines(chunks)
                 self.log(f"Saved: {os.path.basename(path)}")
             except Exception as e:
                 messagebox.showerror("Error Saving File", f"Could not save file:\n{e}")
                 self.log("File save error")
     def clear_all(self):
         self.input_text.delete("1.0", tk.END)
-        self.output_text.config(state=tk.NORMAL)
-        self.output_text.delete("1.0", tk.END)
-        self.output_text.config(state=tk.DISABLED)
-        self.tree.delete(*self.tree.get_children())
+        if self.output_text is not None:
+            self.output_text.config(state=tk.NORMAL)
+            self.output_text.delete("1.0", tk.END)
+            self.output_text.config(state=tk.DISABLED)
+            self.tree.delete(*self.tree.get_children())
+        self._tree_fill = None
+        self.clear_diff()
         self.current_data = None
+        self.current_tape = None
+        self._tape_items = {}
+        self._tape_search = ("", 0)
+        self.rendered_chunks = []
+        self.render_complete = False
+        self._render_token += 1
         self.input_text_widget.clear_highlight("error")
+        self.input_text_widget.clear_highlight("diff")
         self.log("Cleared")
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,201 @@
+"""
+Micro-benchmarks for the JSON tools.
+
+    python benchmarks.py [--records N] [--repeat R]
+
+Each case prints one line so runs can be saved and compared
+(e.g. `python benchmarks.py > bench_output.txt`).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Optional, Tuple
+import json_backend
+def make_payload(n: int):
+    return [
+        {
+            "id": i,
+            "name": f"user-{i}",
+            "city": "Zürich" if i % 3 else "São Paulo",
+            "active": i % 2 == 0,
+            "score": i * 1.25,
+            "tags": ["a", "b", str(i % 7)],
+            "address": {"street": f"{i} Main St", "zip": f"{10000 + i % 9000}", "geo": {"lat": 47.3, "lng": 8.5}},
+            "note": None,
+        }
+        for i in range(n)
+    ]
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+def bench_backends(text: str, repeat: int):
+    obj = json.loads(text)
+    current = json_backend.backend_name()
+    base = None
+    try:
+        for name in ["stdlib"] + [b for b in json_backend.available_backends() if b != "stdlib"]:
+            json_backend.set_backend(name)
+            t_loads = _best(lambda: json_backend.loads(text), repeat)
+            t_dumps = _best(lambda: json_backend.dumps(obj, indent=2), repeat)
+            if base is None:
+                base = (t_loads, t_dumps)
+            print(f"backend {name:<9} loads {t_loads:9.1f} ms (x{base[0] / t_loads:4.1f})"
+                  f"   dumps(indent=2) {t_dumps:9.1f} ms (x{base[1] / t_dumps:4.1f})")
+    finally:
+        json_backend.set_backend(current)
+def bench_pretty(obj, repeat: int):
+    def first_chunk():
+        return next(json_backend.iter_dumps(obj, indent=2))
+    t_full = _best(lambda: json_backend.dumps(obj, indent=2), repeat)
+    t_first = _best(first_chunk, repeat)
+    t_stream = _best(lambda: sum(len(c) for c in json_backend.iter_dumps(obj, indent=2)), repeat)
+    print(f"pretty    dumps {t_full:9.1f} ms   iter_dumps first chunk {t_first:7.2f} ms   all chunks {t_stream:9.1f} ms")
+def _retained_mb(fn) -> float:
+    return _memory_mb(fn)[0]
+def _memory_mb(fn) -> Tuple[float, float]:
+    """(retained, peak) MB allocated while running `fn`."""
+    tracemalloc.start()
+    result = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current / 1e6, peak / 1e6
+def bench_rowstore(records, repeat: int):
+    from json_tables import RowStore, flatten_dict
+    def dict_rows():
+        return [flatten_dict(r) for r in records]
+    def store_rows():
+        store = RowStore()
+        store.extend(records)
+        return store
+    t_dict, mb_dict = _best(dict_rows, repeat), _retained_mb(dict_rows)
+    t_store, mb_store = _best(store_rows, repeat), _retained_mb(store_rows)
+    print(f"rowstore  dict rows {t_dict:9.1f} ms {mb_dict:7.1f} MB   RowStore {t_store:9.1f} ms {mb_store:7.1f} MB"
+          f" (x{mb_dict / mb_store:4.1f} less memory)")
+def bench_diff(text: str, repeat: int):
+    from json_diff import diff
+    a, same, b = json.loads(text), json.loads(text), json.loads(text)
+    b[len(b) // 2]["address"]["zip"] = "changed"
+    del b[len(b) // 3]
+    b.insert(len(b) // 4, {"id": -1})
+    t_equal = _best(lambda: diff(a, same), repeat)
+    t_edit = _best(lambda: diff(a, b), repeat)
+    print(f"diff      identical {t_equal:9.1f} ms   3 edits {t_edit:9.1f} ms ({len(diff(a, b))} changes)")
+def bench_tape(text: str, repeat: int):
+    """Parsed object graph vs Tape: build time, memory kept and peak memory
+    while building."""
+    from json_tape import Tape
+    t_loads, (mb_loads, peak_loads) = _best(lambda: json_backend.loads(text), repeat), \
+        _memory_mb(lambda: json_backend.loads(text))
+    t_tape, (mb_tape, peak_tape) = _best(lambda: Tape(text), repeat), _memory_mb(lambda: Tape(text))
+    print(f"tape      object graph {t_loads:9.1f} ms {mb_loads:7.1f} MB (peak {peak_loads:7.1f})   "
+          f"Tape {t_tape:9.1f} ms {mb_tape:7.1f} MB (peak {peak_tape:7.1f})"
+          f" (x{mb_loads / mb_tape:4.1f} less kept, x{peak_loads / peak_tape:4.1f} lower peak)")
+def bench_sqlite_types(text: str, repeat: int):
+    """SQLite export with sampled vs verified type inference, and a numeric
+    range query on a column of numeric strings before and after the
+    suggested indexes."""
+    import sqlite3
+    from json_tables import json_to_sqlite
+    def load(**kw):
+        conn = sqlite3.connect(":memory:")
+        json_to_sqlite(text, ":memory:", "data", if_exists="replace", conn=conn, **kw)
+        return conn
+    t_sampled = _best(lambda: load(verify_types=False), repeat)
+    t_verified = _best(load, repeat)
+    sql = "SELECT COUNT(*) FROM data WHERE address_zip BETWEEN 12000 AND 12099"
+    plain, indexed = load(), load(create_indexes=True)
+    t_scan = _best(lambda: plain.execute(sql).fetchone(), repeat)
+    t_index = _best(lambda: indexed.execute(sql).fetchone(), repeat)
+    print(f"sqlite    sampled {t_sampled:9.1f} ms   verified {t_verified:9.1f} ms   "
+          f"zip range scan {t_scan:7.2f} ms   indexed {t_index:7.2f} ms")
+def bench_parallel_repair(text: str, workers: int = None):
+    """Whole-string repair vs chunked repair of the same broken array, one of
+    records and one of scalars of about the same size."""
+    from json_repair import repair_array_parallel, repair_pipeline
+    records = text.replace("true", "True").replace("null", "None").replace("}]", "},]")
+    literals = ("True", "None", "'a, b]'", "1.5", "-42")
+    scalars = "[" + ", ".join(literals[i % 5] for i in range(len(records) // 6)) + ",]"
+    for label, broken in (("records", records), ("scalars", scalars)):
+        t0 = time.perf_counter()
+        repair_pipeline(broken)
+        t_serial = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        _, chunks = repair_array_parallel(broken, workers=workers, chunk_chars=max(1 << 20, len(broken) // 64))
+        t_chunked = time.perf_counter() - t0
+        print(f"repair    {label:<7} whole {t_serial * 1000:9.1f} ms   {len(chunks)} chunks on "
+              f"{workers or os.cpu_count()} core(s) {t_chunked * 1000:9.1f} ms (x{t_serial / t_chunked:4.1f})")
+IMPORT_MODULES = ("json_backend", "json_io", "json_repair", "json_recover", "json_diff", "json_tape",
+                  "json_tables", "json_table_converter", "auto_repair_json")
+def _import_ms(module: str) -> Optional[float]:
+    """Cumulative import time of `module` in a fresh interpreter (-X importtime),
+    or None if this interpreter cannot import it."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=here,
+                          capture_output=True, text=True)
+    if proc.returncode:
+        return None  # e.g. needs a newer Python than the one running the benchmarks
+    last = proc.stderr.strip().splitlines()[-1]  # "import time: self | cumulative | module"
+    return int(last.split("|")[1]) / 1000.0
+def bench_imports(repeat: int):
+    """Import cost of each module, so start-up regressions show up."""
+    for module in IMPORT_MODULES:
+        best = _import_ms(module)
+        if best is None:
+            print(f"import    {module:<22} not importable by Python {sys.version.split()[0]}")
+            continue
+        for _ in range(max(repeat, 3) - 1):
+            best = min(best, _import_ms(module))
+        print(f"import    {module:<22} {best:9.1f} ms")
+def bench_worker(jobs: int):
+    """Many tiny repair jobs: one process per file vs one warm json_worker."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    text = "{id: 1, name: 'x', ok: True, tags: ['a', 'b',],}"
+    cold_runs = max(1, min(jobs, 20))
+    one_shot = "import sys, json_tables, json_repair; json_repair.repair_pipeline(sys.argv[1])"
+    t0 = time.perf_counter()
+    for _ in range(cold_runs):
+        subprocess.run([sys.executable, "-c", one_shot, text], cwd=here, check=True)
+    cold = cold_runs / (time.perf_counter() - t0)
+    proc = subprocess.Popen([sys.executable, "json_worker.py", "--workers", "1"], cwd=here,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    proc.stdin.write(b'{"id": 0, "op": "ping"}\n')
+    proc.stdin.flush()
+    proc.stdout.readline()  # started and warm
+    def feed():
+        proc.stdin.write(b"".join(json.dumps({"id": i, "op": "repair", "text": text}).encode() + b"\n"
+                                  for i in range(jobs)))
+        proc.stdin.close()
+    t0 = time.perf_counter()
+    threading.Thread(target=feed, daemon=True).start()
+    done = sum(1 for line in proc.stdout if json.loads(line)["ok"])
+    warm = jobs / (time.perf_counter() - t0)
+    proc.wait()
+    print(f"worker    per-process {cold:9.1f} jobs/s   warm worker {warm:9.1f} jobs/s (x{warm / cold:5.0f}, {done}/{jobs} ok)")
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the JSON tools.")
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    bench_imports(args.repeat)
+    text = json.dumps(make_payload(args.records), ensure_ascii=False)
+    print(f"payload: {args.records:,} records, {len(text) / 1e6:.1f} MB")
+    bench_backends(text, args.repeat)
+    bench_pretty(json.loads(text), args.repeat)
+    bench_rowstore(json.loads(text), args.repeat)
+    bench_diff(text, args.repeat)
+    bench_tape(text, args.repeat)
+    bench_sqlite_types(text, args.repeat)
+    bench_parallel_repair(text)
+    bench_worker(2000)
+if __name__ == "__main__":
+    main()
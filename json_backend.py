@@ -0,0 +1,223 @@
+"""
+Pluggable JSON parse/serialize backend shared by the repair viewer and the
+table converter.
+
+The fastest installed parser is picked at import time (orjson, simdjson,
+ujson, in that order) and everything falls back to the stdlib `json` module:
+
+* `loads` retries with `json.loads` whenever the fast parser rejects the
+  input, so accepted input is exactly what the stdlib accepts (NaN, huge
+  integers, lone surrogates) and failures always raise a stdlib
+  `json.JSONDecodeError` with the usual `lineno` / `colno` / `pos`.
+* `dumps` always behaves like `json.dumps(..., ensure_ascii=False)`. Only
+  orjson can serialize, and only for `indent=2` or compact output; anything
+  it cannot encode (non-str keys, >64-bit ints, NaN and Infinity, which it
+  would write as `null`) goes through the stdlib. orjson spells extreme
+  floats without the exponent sign/padding (`1e16` vs `1e+16`); pick the
+  `stdlib` backend when byte-identical output matters.
+
+Set JSON_TOOLS_BACKEND=stdlib|orjson|simdjson|ujson to force a backend.
+"""
+import functools
+import gc
+import json
+import math
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+JSONDecodeError = json.JSONDecodeError
+# orjson silently turns integers wider than 64 bits into floats; send any
+# document with a run of 19+ digits to the stdlib instead. Mapping digits to
+# "0" and everything else to " " keeps the check at C speed (a regex is ~8x
+# slower on digit-heavy input).
+_DIGIT_MASK = bytes(48 if 48 <= c <= 57 else 32 for c in range(256))
+_LONG_DIGITS = b"0" * 19
+def _to_utf8(s) -> bytes:
+    return s.encode("utf-8", "surrogatepass") if isinstance(s, str) else s
+def _has_big_int(b: bytes) -> bool:
+    return b.translate(_DIGIT_MASK).find(_LONG_DIGITS) != -1
+def _without_gc(loads_fn):
+    # Building a large object graph triggers many pointless gen-0/1/2
+    # collections; suspending GC for the duration of one parse avoids them.
+    def wrapper(s):
+        if not gc.isenabled():
+            return loads_fn(s)
+        gc.disable()
+        try:
+            return loads_fn(s)
+        finally:
+            gc.enable()
+    return wrapper
+def _all_finite(obj) -> bool:
+    """False if any float inside `obj` is NaN or +-Infinity."""
+    isfinite = math.isfinite
+    if not isinstance(obj, (dict, list, tuple)):
+        return type(obj) is not float or isfinite(obj)
+    stack = [obj]
+    while stack:
+        container = stack.pop()
+        for v in (container.values() if isinstance(container, dict) else container):
+            t = type(v)
+            if t is float:
+                if not isfinite(v):
+                    return False
+            elif t is dict or t is list or t is tuple:
+                stack.append(v)
+    return True
+def _stdlib_dumps(obj, indent=None, sort_keys=False, compact=False) -> str:
+    separators = (",", ":") if compact else None
+    return json.dumps(obj, indent=None if compact else indent, sort_keys=sort_keys,
+                      ensure_ascii=False, separators=separators)
+def _load_backends() -> Dict[str, Tuple[Callable, Optional[Callable]]]:
+    backends = {}
+    try:
+        import orjson
+        def orjson_loads(s):
+            b = _to_utf8(s)
+            if _has_big_int(b):
+                return json.loads(s)
+            try:
+                return orjson.loads(b)
+            except orjson.JSONDecodeError:
+                return json.loads(s)
+        def orjson_encode(obj, option=0) -> Optional[bytes]:
+            # None when orjson cannot reproduce the stdlib's output.
+            try:
+                b = orjson.dumps(obj, option=option)
+            except TypeError:  # non-str keys, >64-bit ints
+                return None
+            # NaN and +-Infinity come out as null, so only output with a null
+            # in it needs the (cheaper than re-parsing) walk for them.
+            if b"null" in b and not _all_finite(obj):
+                return None
+            return b
+        def orjson_dumps(obj, indent=None, sort_keys=False, compact=False, checked=True):
+            if not compact and indent != 2:
+                return _stdlib_dumps(obj, indent=indent, sort_keys=sort_keys)
+            option = orjson.OPT_SORT_KEYS if sort_keys else 0
+            if not compact:
+                option |= orjson.OPT_INDENT_2
+            b = orjson_encode(obj, option) if checked else orjson.dumps(obj, option=option)
+            if b is None:
+                return _stdlib_dumps(obj, indent=indent, sort_keys=sort_keys, compact=compact)
+            return b.decode("utf-8")
+        # iter_dumps checks the whole document once, then encodes every batch
+        # with the same encoder and without re-checking.
+        orjson_dumps.encodes = lambda obj: orjson_encode(obj) is not None
+        backends["orjson"] = (orjson_loads, orjson_dumps)
+    except ImportError:
+        pass
+    try:
+        import simdjson
+        def simdjson_loads(s):
+            try:
+                return simdjson.loads(s)
+            except ValueError:
+                return json.loads(s)
+        backends["simdjson"] = (simdjson_loads, None)
+    except ImportError:
+        pass
+    try:
+        import ujson
+        def ujson_loads(s):
+            if _has_big_int(_to_utf8(s)):
+                return json.loads(s)
+            try:
+                return ujson.loads(s)
+            except ValueError:
+                return json.loads(s)
+        backends["ujson"] = (ujson_loads, None)
+    except ImportError:
+        pass
+    backends["stdlib"] = (json.loads, _stdlib_dumps)
+    return backends
+_BACKENDS = _load_backends()
+_active = "stdlib"
+_loads = json.loads
+_dumps = _stdlib_dumps
+def available_backends() -> List[str]:
+    return list(_BACKENDS)
+def backend_name() -> str:
+    return _active
+def set_backend(name: str):
+    """Switch the active backend. Raises ValueError if it is not installed."""
+    global _active, _loads, _dumps
+    if name not in _BACKENDS:
+        raise ValueError(f"JSON backend '{name}' is not available (have: {', '.join(_BACKENDS)})")
+    loads_fn, dumps_fn = _BACKENDS[name]
+    _active = name
+    _loads = _without_gc(loads_fn)
+    # Parse-only backends serialize with the best available encoder.
+    _dumps = dumps_fn or next(d for d in (b[1] for b in _BACKENDS.values()) if d is not None)
+def loads(s):
+    """Parse JSON text (str or bytes). Raises json.JSONDecodeError on failure."""
+    return _loads(s)
+def dumps(obj, indent=None, sort_keys=False, compact=False) -> str:
+    """Serialize like json.dumps(obj, indent=indent, ensure_ascii=False).
+    `compact=True` uses (",", ":") separators and ignores `indent`."""
+    return _dumps(obj, indent=indent, sort_keys=sort_keys, compact=compact)
+# Containers with more members than this are emitted in batches of
+# _BATCH_SIZE members (one dumps() call per batch); smaller ones in one call.
+_SPLIT_THRESHOLD = 64
+_BATCH_SIZE = 256
+def _splittable(obj) -> bool:
+    if isinstance(obj, list):
+        return len(obj) > _SPLIT_THRESHOLD
+    return isinstance(obj, dict) and len(obj) > _SPLIT_THRESHOLD and all(isinstance(k, str) for k in obj)
+def _iter_parts(obj, indent, sort_keys, compact, level, dumps_fn):
+    if not _splittable(obj):
+        text = dumps_fn(obj, indent=indent, sort_keys=sort_keys, compact=compact)
+        yield text if compact or level == 0 else text.replace("\n", "\n" + " " * (indent * level))
+        return
+    is_dict = isinstance(obj, dict)
+    items = (sorted(obj.items()) if sort_keys else list(obj.items())) if is_dict else obj
+    extra = "" if compact else " " * (indent * level)
+    pad = "" if compact else " " * (indent * (level + 1))
+    sep = "," if compact else ",\n"
+    yield "[{"[is_dict] + ("" if compact else "\n")
+    i, n = 0, len(items)
+    while i < n:
+        if i:
+            yield sep
+        value = items[i][1] if is_dict else items[i]
+        if _splittable(value):
+            key = json.dumps(items[i][0], ensure_ascii=False) + (":" if compact else ": ") if is_dict else ""
+            yield pad + key
+            yield from _iter_parts(value, indent, sort_keys, compact, level + 1, dumps_fn)
+            i += 1
+            continue
+        j = i + 1
+        while j < n and j - i < _BATCH_SIZE and not _splittable(items[j][1] if is_dict else items[j]):
+            j += 1
+        batch = items[i:j]
+        text = dumps_fn(dict(batch) if is_dict else batch, indent=indent, sort_keys=sort_keys, compact=compact)
+        if compact:
+            yield text[1:-1]
+        else:
+            inner = text[2:-2]  # drop the batch's own "[\n" / "\n]"
+            yield extra + inner.replace("\n", "\n" + extra) if extra else inner
+        i = j
+    yield ("" if compact else "\n" + extra) + "]}"[is_dict]
+def iter_dumps(obj, indent=2, sort_keys=False, compact=False, chunk_size=1 << 16):
+    """Serialize like dumps() but yield the text in chunks of roughly
+    `chunk_size` characters, so output can be shown or written while the
+    rest is still being produced. "".join() of the chunks equals dumps()."""
+    dumps_fn = _dumps
+    encodes = getattr(dumps_fn, "encodes", None)
+    if encodes is not None and _splittable(obj):
+        if encodes(obj):
+            dumps_fn = functools.partial(_dumps, checked=False)
+        else:
+            dumps_fn = _stdlib_dumps  # for every batch, as dumps() would for the whole
+    buf = []
+    size = 0
+    for part in _iter_parts(obj, indent, sort_keys, compact, 0, dumps_fn):
+        buf.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield "".join(buf)
+            buf = []
+            size = 0
+    if buf:
+        yield "".join(buf)
+_requested = os.environ.get("JSON_TOOLS_BACKEND", "")
+set_backend(_requested if _requested in _BACKENDS else next(iter(_BACKENDS)))
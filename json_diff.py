@@ -0,0 +1,226 @@
+"""
+Structural diff of two parsed JSON documents.
+
+Every object and array gets a Merkle-style digest: a hash of its scalar
+members plus the digests of its container members, with object keys
+sorted so member order does not matter. Containers with only a few
+members are hashed from one compact serialization of the whole subtree
+instead (a single C-level dumps call is far cheaper than hashing each
+small node in Python); the digest only depends on content, so equal
+subtrees always hash alike. Digests are cached per container and the diff
+only descends into members whose digests differ, so identical branches
+are skipped and the work after hashing scales with the size of the change.
+
+Arrays are aligned by element digest, so an insertion shows up as one
+added element rather than a cascade of changes: the common prefix and
+suffix are trimmed, long middles are split at elements that occur exactly
+once on each side (patience diff), and only the small gaps left between
+those anchors go through difflib. Gaps without anchors that are still too
+long for difflib are compared position by position.
+
+Headless use:
+
+    python json_diff.py old.json new.json [--limit N]
+"""
+import bisect
+import difflib
+import hashlib
+import re
+import sys
+from typing import Any, Dict, List, NamedTuple, Tuple
+import json_backend
+import json_io
+# Longest array stretch handed to difflib, whose alignment is quadratic in the
+# worst case; longer stretches are split at unique anchors first.
+MAX_ALIGN = 2000
+_IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+# Stand-in for a container member inside its parent's hashed serialization.
+_DIGEST_MARK = "\x00#"
+# Containers with at most this many members are hashed as one serialized blob.
+_MERKLE_FANOUT = 64
+class Change(NamedTuple):
+    op: str      # "added", "removed" or "changed"
+    path: str    # JSONPath-style, e.g. $.items[3].name
+    old: Any
+    new: Any
+def child_path(path: str, key) -> str:
+    """Extend a JSONPath with an object key or array index."""
+    if isinstance(key, int):
+        return f"{path}[{key}]"
+    if _IDENT_RE.match(key):
+        return f"{path}.{key}"
+    return f"{path}[{json_backend.dumps(key)}]"
+def _blob_digest(obj) -> bytes:
+    """Digest of a subtree from its canonical (compact, sorted-key) text."""
+    text = json_backend.dumps(obj, compact=True, sort_keys=True)
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+class _Hasher:
+    def __init__(self):
+        self.cache: Dict[int, bytes] = {}
+        self.members: Dict[int, list] = {}
+    def digest(self, obj) -> bytes:
+        """Digest of an object or array."""
+        d = self.cache.get(id(obj))
+        if d is None:
+            if len(obj) <= _MERKLE_FANOUT:
+                d = _blob_digest(obj)
+            elif isinstance(obj, dict):
+                d = _blob_digest({k: (_DIGEST_MARK + self.digest(v).hex() if isinstance(v, (dict, list)) else v)
+                                  for k, v in obj.items()})
+            else:
+                d = _blob_digest([_DIGEST_MARK + k.hex() if isinstance(k, bytes) else v
+                                  for k, v in zip(self.keys(obj), obj)])
+            self.cache[id(obj)] = d
+        return d
+    def keys(self, items: list) -> list:
+        """Comparison key of every array element (digest or typed scalar)."""
+        keys = self.members.get(id(items))
+        if keys is None:
+            cache = self.cache
+            keys = []
+            for v in items:
+                if isinstance(v, (dict, list)):
+                    d = cache.get(id(v))
+                    if d is None:
+                        d = cache[id(v)] = _blob_digest(v) if len(v) <= _MERKLE_FANOUT else self.digest(v)
+                    keys.append(d)
+                else:
+                    keys.append((type(v), v))
+            self.members[id(items)] = keys
+        return keys
+    def element_key(self, v):
+        if isinstance(v, (dict, list)):
+            return self.digest(v)
+        return (type(v), v)
+def _same_scalar(a, b) -> bool:
+    return type(a) is type(b) and a == b
+def _anchors(keys_a, keys_b, i1, i2, j1, j2) -> List[Tuple[int, int]]:
+    """Positions (i, j) of keys that occur once in each range, reduced to the
+    longest run that is increasing on both sides."""
+    seen_a: Dict[Any, int] = {}
+    for i in range(i1, i2):
+        seen_a[keys_a[i]] = -1 if keys_a[i] in seen_a else i
+    seen_b: Dict[Any, int] = {}
+    for j in range(j1, j2):
+        k = keys_b[j]
+        if seen_a.get(k, -1) != -1:
+            seen_b[k] = -1 if k in seen_b else j
+    pairs = [(seen_a[k], j) for k, j in seen_b.items() if j != -1]
+    pairs.sort()
+    # Longest increasing subsequence of the b positions (patience sorting).
+    tails: List[int] = []
+    tail_at: List[int] = []
+    prev = [-1] * len(pairs)
+    for n, (_, j) in enumerate(pairs):
+        pos = bisect.bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_at.append(n)
+        else:
+            tails[pos] = j
+            tail_at[pos] = n
+        prev[n] = tail_at[pos - 1] if pos else -1
+    out = []
+    n = tail_at[-1] if tail_at else -1
+    while n != -1:
+        out.append(pairs[n])
+        n = prev[n]
+    out.reverse()
+    return out
+def _align(keys_a, keys_b, i1, i2, j1, j2, ops: List[Tuple[str, int, int, int, int]]):
+    """Append difflib-style opcodes (without "equal") aligning the two ranges."""
+    while i1 < i2 and j1 < j2 and keys_a[i1] == keys_b[j1]:
+        i1 += 1
+        j1 += 1
+    while i2 > i1 and j2 > j1 and keys_a[i2 - 1] == keys_b[j2 - 1]:
+        i2 -= 1
+        j2 -= 1
+    if i1 == i2 or j1 == j2:
+        if i1 < i2 or j1 < j2:
+            ops.append(("delete" if j1 == j2 else "insert", i1, i2, j1, j2))
+        return
+    if i2 - i1 <= MAX_ALIGN and j2 - j1 <= MAX_ALIGN:
+        matcher = difflib.SequenceMatcher(None, keys_a[i1:i2], keys_b[j1:j2], autojunk=False)
+        for tag, a1, a2, b1, b2 in matcher.get_opcodes():
+            if tag != "equal":
+                ops.append((tag, a1 + i1, a2 + i1, b1 + j1, b2 + j1))
+        return
+    anchors = _anchors(keys_a, keys_b, i1, i2, j1, j2)
+    if not anchors:
+        ops.append(("replace", i1, i2, j1, j2))
+        return
+    for i, j in anchors:
+        _align(keys_a, keys_b, i1, i, j1, j, ops)
+        i1, j1 = i + 1, j + 1
+    _align(keys_a, keys_b, i1, i2, j1, j2, ops)
+def _diff(a, b, path: str, out: List[Change], ha: _Hasher, hb: _Hasher):
+    a_is_dict, b_is_dict = isinstance(a, dict), isinstance(b, dict)
+    a_is_list, b_is_list = isinstance(a, list), isinstance(b, list)
+    if a_is_dict != b_is_dict or a_is_list != b_is_list:
+        out.append(Change("changed", path, a, b))
+        return
+    if not (a_is_dict or a_is_list):
+        if not _same_scalar(a, b):
+            out.append(Change("changed", path, a, b))
+        return
+    if ha.digest(a) == hb.digest(b):
+        return
+    if a_is_dict:
+        for k, v in a.items():
+            if k not in b:
+                out.append(Change("removed", child_path(path, k), v, None))
+            elif ha.element_key(v) != hb.element_key(b[k]):
+                _diff(v, b[k], child_path(path, k), out, ha, hb)
+        for k, v in b.items():
+            if k not in a:
+                out.append(Change("added", child_path(path, k), None, v))
+        return
+    keys_a, keys_b = ha.keys(a), hb.keys(b)
+    ops: List[Tuple[str, int, int, int, int]] = []
+    _align(keys_a, keys_b, 0, len(a), 0, len(b), ops)
+    for tag, i1, i2, j1, j2 in ops:
+        paired = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+        for k in range(paired):
+            if keys_a[i1 + k] != keys_b[j1 + k]:
+                _diff(a[i1 + k], b[j1 + k], child_path(path, i1 + k), out, ha, hb)
+        for i in range(i1 + paired, i2):
+            out.append(Change("removed", child_path(path, i), a[i], None))
+        for j in range(j1 + paired, j2):
+            out.append(Change("added", child_path(path, j), None, b[j]))
+def diff(a, b, path: str = "$") -> List[Change]:
+    """List the structural changes that turn `a` into `b`. Removed and
+    changed paths index into `a`, added paths into `b`."""
+    out: List[Change] = []
+    _diff(a, b, path, out, _Hasher(), _Hasher())
+    return out
+def _short(value, limit: int = 80) -> str:
+    text = json_backend.dumps(value, compact=True)
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+def format_detail(change: Change) -> str:
+    """The value(s) involved in a change, shortened for display."""
+    if change.op == "added":
+        return _short(change.new)
+    if change.op == "removed":
+        return _short(change.old)
+    return f"{_short(change.old)} -> {_short(change.new)}"
+def format_change(change: Change) -> str:
+    mark = {"added": "+", "removed": "-"}.get(change.op, "~")
+    return f"{mark} {change.path}: {format_detail(change)}"
+def _load(path: str):
+    return json_backend.loads(json_io.read_text(path))
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="Structural diff of two JSON files.")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--limit", type=int, default=0, help="print at most N changes (0 = all)")
+    args = parser.parse_args(argv)
+    changes = diff(_load(args.old), _load(args.new))
+    shown = changes[:args.limit] if args.limit else changes
+    for change in shown:
+        print(format_change(change))
+    if len(shown) < len(changes):
+        print(f"... {len(changes) - len(shown)} more")
+    return 1 if changes else 0
+if __name__ == "__main__":
+    sys.exit(main())
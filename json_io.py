@@ -0,0 +1,95 @@
+"""
+Transparent compressed file I/O for the JSON tools.
+
+`open_text` reads gzip, bz2, xz and (with the optional `zstandard` package)
+zstd files by sniffing their magic bytes, whatever the file is called, and
+writes compressed output when the target name ends in .gz, .bz2, .xz or
+.zst. Data is decompressed and compressed as a stream, so a text stream
+from `open_text` can feed the salvage reader or a CSV writer without
+holding the uncompressed file in memory or on disk.
+"""
+import io
+import os
+from typing import List, Optional, Tuple
+_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
+SUFFIXES = {".gz": "gzip", ".gzip": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd", ".zstd": "zstd"}
+def available_codecs() -> List[str]:
+    from importlib.util import find_spec
+    codecs = ["gzip", "bz2", "xz"]
+    if find_spec("zstandard") is not None:
+        codecs.append("zstd")
+    return codecs
+def detect_compression(path: str) -> Optional[str]:
+    """Codec name from the file's leading bytes, or None for plain files."""
+    with open(path, "rb") as f:
+        head = f.read(6)
+    return next((name for magic, name in _MAGIC if head.startswith(magic)), None)
+def compression_for_path(path: str) -> Optional[str]:
+    """Codec implied by the file name's extension, or None."""
+    return SUFFIXES.get(os.path.splitext(path)[1].lower())
+def strip_compression_suffix(path: str) -> str:
+    """"data.json.gz" -> "data.json"."""
+    root, ext = os.path.splitext(path)
+    return root if ext.lower() in SUFFIXES else path
+def _need_zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("zstd compressed files need the 'zstandard' package (pip install zstandard)") from None
+    return zstandard
+def _open_binary(path: str, mode: str, codec: str, level: Optional[int]):
+    # Codec modules are imported on first use; plain files never load them.
+    if codec == "gzip":
+        import gzip
+        return gzip.open(path, mode, compresslevel=6 if level is None else level)
+    if codec == "bz2":
+        import bz2
+        return bz2.open(path, mode, compresslevel=9 if level is None else level)
+    if codec == "xz":
+        import lzma
+        return lzma.open(path, mode, preset=level)
+    zstandard = _need_zstd()
+    raw = open(path, mode)
+    try:
+        if mode == "rb":
+            return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return zstandard.ZstdCompressor(level=3 if level is None else level).stream_writer(raw, closefd=True)
+    except BaseException:
+        raw.close()
+        raise
+def open_text(path: str, mode: str = "r", compression: Optional[str] = "auto", encoding: str = "utf-8",
+              newline: Optional[str] = None, level: Optional[int] = None):
+    """
+    Open `path` as a text stream, like open(path, mode, encoding=...).
+
+    `compression` is a codec name, None for plain text, or "auto": on read
+    the codec is detected from the content, on write it follows the
+    extension. `level` is the codec's compression level (default: codec's
+    usual default).
+    """
+    if mode not in ("r", "w"):
+        raise ValueError("mode must be 'r' or 'w'")
+    if compression == "auto":
+        compression = detect_compression(path) if mode == "r" else compression_for_path(path)
+    if compression is None:
+        return open(path, mode, encoding=encoding, newline=newline)
+    if compression not in ("gzip", "bz2", "xz", "zstd"):
+        raise ValueError(f"unknown compression {compression!r}")
+    binary = _open_binary(path, mode + "b", compression, level)
+    return io.TextIOWrapper(binary, encoding=encoding, newline=newline)
+def read_text(path: str, encoding: str = "utf-8") -> str:
+    """Whole (decompressed) content of `path`."""
+    with open_text(path, "r", encoding=encoding) as f:
+        return f.read()
+def filetypes(label: str, ext: str) -> List[Tuple[str, str]]:
+    """File dialog filter list for `ext` plus its compressed variants."""
+    suffixes = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz", "zstd": ".zst"}
+    types = [(label, f"*{ext}")]
+    types += [(f"{label} ({codec})", f"*{ext}{suffixes[codec]}") for codec in available_codecs()]
+    types.append(("All Files", "*.*"))
+    return types
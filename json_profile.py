@@ -0,0 +1,276 @@
+"""
+Streaming type inference and statistics for table columns.
+
+`ColumnProfiler` takes a column's values one batch at a time and keeps
+only cheap running state: counts, the smallest and largest value of each
+native type, a capped set of distinct values, and a fixed-size reservoir
+sample (Vitter's algorithm L, so the random generator is only consulted
+when an element is actually replaced). Classifying values is the
+expensive part, so the column's kind is first guessed from the sample
+(a sampled text column needs no further checks); a verification pass then
+classifies every value and widens the kind where the sample missed
+something.
+
+Kinds go beyond JSON's own types: strings holding integers, decimals or
+true/false are loaded as numbers, ISO 8601 dates and timestamps keep
+their (sortable) text under a DATE / DATETIME column, and strings holding
+JSON arrays or objects are marked JSON. Only a verified profile declares
+a typed column, since SQLite's column affinity would convert any value
+that merely looks numeric; an unverified one, or one mixing strings with
+numbers, is declared BLOB (no affinity) and its values are stored as they
+are. Strings whose number would not read back as the same text ("00501",
+"1.10", "1e5") stay text.
+"""
+import json
+import math
+import random
+import re
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional
+PROFILE_SAMPLE = 2_000    # reservoir size per column
+DISTINCT_CAP = 100_000    # distinct values counted exactly up to this many
+MAX_SUGGESTED_INDEXES = 5
+_INT_STR_RE = re.compile(r"0|-?[1-9][0-9]{0,17}")  # no leading zeros (zip codes, ids), fits 64 bits
+_REAL_STR_RE = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+(?:[eE][-+]?[0-9]+)?|[eE][-+]?[0-9]+)")
+_DATE_RE = re.compile(r"[0-9]{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12][0-9]|3[01])")
+_DATETIME_RE = re.compile(_DATE_RE.pattern + r"[T ](?:[01][0-9]|2[0-3]):[0-5][0-9](?::[0-5][0-9](?:\.[0-9]+)?)?"
+                          r"(?:Z|[+-](?:[01][0-9]|2[0-3]):?[0-5][0-9])?")
+# Kind -> declared SQLite column type.
+SQL_TYPES = {
+    "integer": "INTEGER", "real": "REAL", "boolean": "BOOLEAN", "date": "DATE",
+    "datetime": "DATETIME", "json": "JSON", "text": "TEXT",
+}
+_NUMERIC = ("boolean", "integer", "real")  # in widening order
+_EXACT_FLOAT = 1 << 53  # integers beyond this are not exact in a REAL column
+def classify(v) -> str:
+    """Kind of one non-null value; strings that spell another kind get a
+    "_str" suffix (e.g. "integer_str")."""
+    t = type(v)
+    if t is bool:
+        return "boolean"
+    if t is int:
+        return "integer"
+    if t is float:
+        return "real"
+    if t is not str:
+        return "text"
+    if _INT_STR_RE.fullmatch(v):
+        return "integer_str"
+    if _REAL_STR_RE.fullmatch(v):
+        return "real_str" if repr(float(v)) == v else "text"
+    if v in ("true", "false", "True", "False", "TRUE", "FALSE"):
+        return "boolean_str"
+    if _DATE_RE.fullmatch(v):
+        return "date"
+    if _DATETIME_RE.fullmatch(v):
+        return "datetime"
+    if v[:1] in ("[", "{") and v[-1:] in ("]", "}"):
+        try:
+            json.loads(v)
+            return "json"
+        except ValueError:
+            pass
+    return "text"
+def widen(a: Optional[str], b: str) -> str:
+    """Narrowest kind that holds both (None: nothing seen yet)."""
+    if a is None or a == b:
+        return b
+    base_a, base_b = a.replace("_str", ""), b.replace("_str", "")
+    suffix = "_str" if a.endswith("_str") or b.endswith("_str") else ""
+    if base_a in _NUMERIC and base_b in _NUMERIC:
+        return max(base_a, base_b, key=_NUMERIC.index) + suffix
+    if {base_a, base_b} == {"date", "datetime"}:
+        return "datetime"
+    return "text"
+def _to_number(v):
+    t = type(v)
+    if t is bool:
+        return int(v)
+    if t is str:
+        if _INT_STR_RE.fullmatch(v):
+            return int(v)
+        if _REAL_STR_RE.fullmatch(v):
+            return float(v)
+        low = v.lower()
+        if low == "true" or low == "false":
+            return int(low == "true")
+    return v
+def converter(kind: str) -> Callable[[Any], Any]:
+    """Value -> what to store in SQLite for a column of `kind` ("" and None
+    become NULL, booleans 0/1)."""
+    if kind.endswith("_str"):
+        def convert(v):
+            if v is None or v == "":
+                return None
+            return _to_number(v)
+        return convert
+    def convert(v):
+        if v == "":
+            return None
+        if type(v) is bool:
+            return 1 if v else 0
+        return v
+    return convert
+class ColumnProfile(NamedTuple):
+    name: str
+    kind: str           # see SQL_TYPES; "_str" suffix when values arrive as strings
+    sql_type: str
+    count: int
+    nulls: int          # None and "" values
+    blanks: int         # of which ""
+    distinct: int       # a lower bound when distinct_capped
+    distinct_capped: bool
+    minimum: Any        # in the column's stored form; None when unknown
+    maximum: Any
+    sampled: int        # values the kind was inferred from
+    verified: bool      # every value was checked against the kind
+    @property
+    def null_rate(self) -> float:
+        return self.nulls / self.count if self.count else 0.0
+    def describe(self) -> str:
+        distinct = f"{self.distinct:,}{'+' if self.distinct_capped else ''}"
+        return f"{self.sql_type}, {self.null_rate:.0%} null, {distinct} distinct"
+def column_converter(profile: ColumnProfile) -> Optional[Callable[[Any], Any]]:
+    """Function turning the profiled column's values into what is stored,
+    or None when they can go in as they are."""
+    if profile.verified and profile.kind.endswith("_str"):
+        return converter(profile.kind)
+    if profile.blanks:
+        return converter("text")
+    return None
+class ColumnProfiler:
+    """Running profile of one column; feed it with `extend` (any number of
+    times) and read the result with `profile`."""
+    def __init__(self, name: str = "", sample_size: int = PROFILE_SAMPLE, distinct_cap: int = DISTINCT_CAP,
+                 seed: Optional[int] = 0):
+        self.name = name
+        self.sample_size = sample_size
+        self.distinct_cap = distinct_cap
+        self.count = 0
+        self.nulls = 0
+        self.blanks = 0
+        self.natives = 0  # filled values that are not strings
+        self.sample: List[Any] = []
+        self.distinct = set()
+        self.capped = False
+        self.num_min = self.num_max = None  # over native numbers
+        self.str_min = self.str_max = None  # over strings
+        self._rng = random.Random(seed)
+        self._seen = 0        # non-null values offered to the reservoir
+        self._next = 0        # index of the next value to go into the full reservoir
+        self._w = 1.0
+    def _skip(self):
+        # Algorithm L: the gap to the next replacement is geometric.
+        rand, log = self._rng.random, math.log
+        self._w *= math.exp(log(rand() or 1e-300) / self.sample_size)
+        self._next += int(log(rand() or 1e-300) / log(max(1 - self._w, 1e-300))) + 1
+    def extend(self, values: Iterable[Any]):
+        # Bulk list / set / min / max calls do the per-value work in C; only
+        # the reservoir's (rare) replacements are visited from Python.
+        batch = values if isinstance(values, (list, tuple)) else list(values)
+        filled = [v for v in batch if v is not None and v != ""]
+        self.count += len(batch)
+        self.nulls += len(batch) - len(filled)
+        self.blanks += batch.count("")
+        if not filled:
+            return
+        k, seen = self.sample_size, self._seen
+        if seen < k:
+            self.sample.extend(filled[:k - seen])
+            if len(self.sample) == k:
+                self._next = k - 1
+                self._skip()
+        end = seen + len(filled)
+        if len(self.sample) == k and self._next < end:
+            sample, rand, log, exp = self.sample, self._rng.random, math.log, math.exp
+            w, nxt = self._w, self._next
+            while nxt < end:
+                if nxt >= seen:
+                    sample[int(rand() * k)] = filled[nxt - seen]
+                w *= exp(log(rand() or 1e-300) / k)
+                nxt += int(log(rand() or 1e-300) / log(max(1 - w, 1e-300))) + 1
+            self._w, self._next = w, nxt
+        self._seen = end
+        if not self.capped:
+            # Each update adds at most `room` new values, so the set never
+            # grows past the cap.
+            distinct, pos = self.distinct, 0
+            room = self.distinct_cap - len(distinct)
+            while room > 0 and pos < len(filled):
+                distinct.update(filled[pos:pos + room])
+                pos += room
+                room = self.distinct_cap - len(distinct)
+            self.capped = room <= 0
+        strs = [v for v in filled if type(v) is str]
+        self.natives += len(filled) - len(strs)
+        nums = [v for v in filled if type(v) is int or type(v) is float]
+        if strs:
+            self.str_min = min(strs) if self.str_min is None else min(self.str_min, min(strs))
+            self.str_max = max(strs) if self.str_max is None else max(self.str_max, max(strs))
+        if nums:
+            self.num_min = min(nums) if self.num_min is None else min(self.num_min, min(nums))
+            self.num_max = max(nums) if self.num_max is None else max(self.num_max, max(nums))
+    def infer_kind(self) -> str:
+        kind = None
+        for v in self.sample:
+            kind = widen(kind, classify(v))
+            if kind == "text":
+                break
+        return kind or "text"
+    def profile(self, verify_values: Optional[Iterable[Any]] = None) -> ColumnProfile:
+        """The column's profile. Pass the column's values again as
+        `verify_values` to check every one of them against the sampled kind;
+        only then is a typed column declared (and min / max known for
+        numbers that arrive as strings)."""
+        kind = self.infer_kind()
+        verified = verify_values is not None
+        lo = hi = None
+        if verified and kind != "text":
+            for v in verify_values:
+                if v is None or v == "":
+                    continue
+                k = classify(v)
+                if k != kind:
+                    kind = widen(kind, k)
+                    if kind == "text":
+                        break
+                if type(v) is str and kind.endswith("_str"):
+                    c = _to_number(v)
+                    if lo is None or c < lo:
+                        lo = c
+                    if hi is None or c > hi:
+                        hi = c
+        base = kind.replace("_str", "")
+        if base in ("integer", "real"):
+            if not kind.endswith("_str"):
+                lo, hi = self.num_min, self.num_max
+            elif not verified:
+                lo = hi = None
+            elif self.num_min is not None:  # native numbers alongside the numeric strings
+                lo = self.num_min if lo is None else min(lo, self.num_min)
+                hi = self.num_max if hi is None else max(hi, self.num_max)
+        elif base != "boolean":
+            lo, hi = self.str_min, self.str_max
+            if self.num_min is not None:
+                lo, hi = None, None  # strings and numbers do not compare
+        if not verified or (base == "text" and self.natives):
+            sql_type = "BLOB"
+        elif base == "real" and self.num_min is not None and max(-self.num_min, self.num_max) > _EXACT_FLOAT:
+            sql_type = "BLOB"
+        else:
+            sql_type = SQL_TYPES[base]
+        return ColumnProfile(self.name, kind, sql_type, self.count, self.nulls, self.blanks, len(self.distinct),
+                             self.capped, lo, hi, min(self._seen, self.sample_size), verified)
+def suggest_indexes(profiles: List[ColumnProfile], limit: int = MAX_SUGGESTED_INDEXES) -> List[str]:
+    """Columns most worth an index: mostly filled, selective (not booleans or
+    a handful of repeated values) and not JSON blobs; typed columns first."""
+    picks = []
+    for p in profiles:
+        filled = p.count - p.nulls
+        if not filled or p.null_rate > 0.5 or p.sql_type in ("BOOLEAN", "JSON"):
+            continue
+        selectivity = 1.0 if p.distinct_capped else p.distinct / filled
+        if p.distinct < 2 or selectivity < 0.01:
+            continue
+        picks.append((-selectivity, p.sql_type in ("TEXT", "BLOB"), p.name))
+    picks.sort()
+    return [name for _, _, name in picks[:limit]]
@@ -0,0 +1,288 @@
+"""
+Error-tolerant JSON reader that salvages what it can from truncated or
+corrupt input instead of failing on the first bad byte.
+
+Two layouts are understood:
+
+* a top-level array: each element is decoded on its own; a corrupt element
+  is quarantined and reading resumes at the next top-level element, and a
+  truncated final element is closed off (unbalanced brackets are completed
+  after cutting back to the last complete member);
+* a stream of values (NDJSON, concatenated JSON or a single document): each
+  value is decoded in turn and a bad one is skipped up to the next line that
+  starts a new object or array.
+
+Input is read incrementally from a text stream, so a large file is never
+held in memory at once. Quarantined spans are reported as (start, end)
+character offsets into the decoded text.
+"""
+import io
+import json
+import re
+from typing import Any, Iterator, List, NamedTuple, Optional, Tuple
+CHUNK_SIZE = 1 << 20
+_WS = " \t\r\n﻿"
+_DECODER = json.JSONDecoder()
+# Characters that matter to the boundary scan; everything else is skipped in C.
+_STRUCT_RE = re.compile(r'["\[\]{},]')
+_STRING_TAIL_RE = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+_LINE_START_RE = re.compile(r"\n[ \t]*(?=[\[{])")
+# Cutting a truncated value back and re-closing it is retried at most this
+# many times (each retry is one parse of the fragment).
+_MAX_CLOSE_ATTEMPTS = 32
+class SalvageResult(NamedTuple):
+    records: List[Any]
+    quarantined: List[Tuple[int, int]]
+    mode: str  # "array" or "stream"
+    @property
+    def document(self) -> Any:
+        """The salvaged data shaped like the input: the list of elements for
+        an array, the value itself for a single document, else a list."""
+        if self.mode == "stream" and len(self.records) == 1:
+            return self.records[0]
+        return self.records
+def _scan_boundary(buf: str, pos: int) -> Tuple[int, bool]:
+    """
+    Find the end of the array element starting at `pos`: the first ',' or
+    ']' outside strings with no unclosed bracket of its own. Returns
+    (index, found); when not found the index is where the scan stopped.
+    """
+    depth = 0
+    n = len(buf)
+    while pos < n:
+        m = _STRUCT_RE.search(buf, pos)
+        if m is None:
+            return n, False
+        ch = m.group()
+        pos = m.end()
+        if ch == '"':
+            s = _STRING_TAIL_RE.match(buf, pos)
+            if s is None:
+                return n, False
+            pos = s.end()
+        elif ch in "[{":
+            depth += 1
+        elif ch in "]}":
+            if depth == 0:
+                return m.start(), True
+            depth -= 1
+        elif depth == 0:
+            return m.start(), True
+    return n, False
+def close_truncated(fragment: str) -> Optional[Tuple[Any, int]]:
+    """
+    Recover a value whose text was cut off: cut back to the last complete
+    member and append the missing closing brackets. Returns (value, used)
+    where `used` is how many characters of `fragment` the value covers, or
+    None when nothing can be recovered.
+    """
+    stack = []
+    cuts = []
+    pos = 0
+    n = len(fragment)
+    while pos < n:
+        m = _STRUCT_RE.search(fragment, pos)
+        if m is None:
+            break
+        ch = m.group()
+        pos = m.end()
+        if ch == '"':
+            s = _STRING_TAIL_RE.match(fragment, pos)
+            if s is None:
+                break
+            pos = s.end()
+        elif ch in "[{":
+            stack.append("]" if ch == "[" else "}")
+            cuts.append((pos, "".join(reversed(stack))))
+        elif ch in "]}":
+            if not stack:
+                break
+            stack.pop()
+            cuts.append((pos, "".join(reversed(stack))))
+        else:
+            cuts.append((m.start(), "".join(reversed(stack))))
+    cuts.append((n, "".join(reversed(stack))))
+    for cut, closers in reversed(cuts[-_MAX_CLOSE_ATTEMPTS:]):
+        try:
+            value, end = _DECODER.raw_decode(fragment[:cut].rstrip().rstrip(",") + closers)
+        except json.JSONDecodeError:
+            continue
+        if value == {} or value == []:
+            break  # only the opening bracket survived: nothing worth keeping
+        return value, cut
+    return None
+class _Reader:
+    """Sliding window over a text stream; offsets are absolute."""
+    def __init__(self, fp, chunk_size: int):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.base = 0
+        self.pos = 0
+        self.eof = False
+    def compact(self):
+        """Drop consumed text. Only call between records: buffer indices shift."""
+        if self.pos > self.chunk_size:
+            self.base += self.pos
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+    def fill(self, want: int = 0) -> bool:
+        """Append more text; returns False at end of stream."""
+        if self.eof:
+            return False
+        chunk = self.fp.read(max(self.chunk_size, want))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+    def fill_all(self):
+        while self.fill(len(self.buf)):
+            pass
+    def skip_ws(self) -> bool:
+        """Advance past whitespace; returns False if the stream is exhausted."""
+        while True:
+            n = len(self.buf)
+            while self.pos < n and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < n:
+                return True
+            if not self.fill():
+                return False
+    def offset(self, i: Optional[int] = None) -> int:
+        return self.base + (self.pos if i is None else i)
+def _decode_at(reader: _Reader):
+    """raw_decode at the reader position, pulling in more text while the
+    value may simply continue past the end of the buffer."""
+    while True:
+        try:
+            value, end = _DECODER.raw_decode(reader.buf, reader.pos)
+        except json.JSONDecodeError as e:
+            cut_off = e.pos >= len(reader.buf) - 1 or e.msg.startswith("Unterminated string")
+            if cut_off and reader.fill(len(reader.buf) - reader.pos):
+                continue
+            raise
+        if end >= len(reader.buf) and reader.fill():
+            continue  # a number may continue in the next chunk
+        return value, end
+def _salvage_tail(reader: _Reader, quarantined: List[Tuple[int, int]]) -> List[Any]:
+    fragment = reader.buf[reader.pos:]
+    closed = close_truncated(fragment)
+    end = len(reader.buf)
+    reader.pos, start = end, reader.pos
+    if closed is None:
+        quarantined.append((reader.offset(start), reader.offset(end)))
+        return []
+    value, used = closed
+    if fragment[used:].strip(_WS + ",]}"):
+        quarantined.append((reader.offset(start + used), reader.offset(end)))
+    return [value]
+def _compact_resync(buf: str, start: int, opener: str) -> int:
+    """For single-line arrays: the next ", <opener>" that begins a value that
+    is itself followed by another ", <opener>" or by the final "]" (which
+    rules out most values nested inside the corrupt element). Returns the
+    value start or -1."""
+    sibling = re.compile(r"\s*,\s*" + re.escape(opener) + r"|\s*\][\s﻿]*$")
+    for m in re.finditer(r",\s*(?=" + re.escape(opener) + ")", buf[start:]):
+        at = start + m.end()
+        try:
+            _, end = _DECODER.raw_decode(buf, at)
+        except json.JSONDecodeError:
+            continue
+        if sibling.match(buf, end):
+            return at
+    return -1
+def _iter_array(reader: _Reader, quarantined: List[Tuple[int, int]]) -> Iterator[Any]:
+    reader.pos += 1  # "["
+    line_start = None
+    opener = None
+    while reader.skip_ws():
+        reader.compact()
+        ch = reader.buf[reader.pos]
+        if ch == "]":
+            reader.pos += 1
+            if reader.skip_ws():
+                # Anything after the closing bracket is not part of the document.
+                start = reader.pos
+                reader.fill_all()
+                quarantined.append((reader.offset(start), reader.offset(len(reader.buf))))
+                reader.pos = len(reader.buf)
+            return
+        if ch == ",":
+            reader.pos += 1
+            continue
+        if opener is None:
+            opener = ch
+            # Pretty-printed arrays start every element on its own line at the
+            # same indent; that gives a resync point even when a corrupt
+            # element leaves a bracket open.
+            nl = reader.buf.rfind("\n", 0, reader.pos)
+            if nl != -1 and not reader.buf[nl + 1:reader.pos].strip(" \t"):
+                indent = reader.buf[nl + 1:reader.pos]
+                line_start = re.compile("\n" + re.escape(indent) + r"(?=[\[{\"\-0-9tfn])")
+        try:
+            value, end = _decode_at(reader)
+        except json.JSONDecodeError as e:
+            while True:
+                stop, found = _scan_boundary(reader.buf, reader.pos)
+                resync = line_start.search(reader.buf, e.pos) if line_start is not None else None
+                if resync is not None and resync.end() < stop:
+                    stop, found = resync.end(), True
+                if found or not reader.fill(len(reader.buf) - reader.pos):
+                    break
+            if not found and line_start is None:
+                at = _compact_resync(reader.buf, e.pos, opener)
+                if at != -1:
+                    stop, found = at, True
+            if not found:
+                yield from _salvage_tail(reader, quarantined)
+                return
+            quarantined.append((reader.offset(), reader.offset(stop)))
+            reader.pos = stop
+            continue
+        reader.pos = end
+        yield value
+def _iter_stream(reader: _Reader, quarantined: List[Tuple[int, int]]) -> Iterator[Any]:
+    while reader.skip_ws():
+        reader.compact()
+        try:
+            value, end = _decode_at(reader)
+        except json.JSONDecodeError as e:
+            while True:
+                resync = _LINE_START_RE.search(reader.buf, max(reader.pos, e.pos - 1))
+                if resync is not None or not reader.fill():
+                    break
+            if resync is None:
+                yield from _salvage_tail(reader, quarantined)
+                return
+            quarantined.append((reader.offset(), reader.offset(resync.end())))
+            reader.pos = resync.end()
+            continue
+        reader.pos = end
+        yield value
+class Salvager:
+    """
+    Iterate over every recoverable top-level record of the text stream `fp`
+    (array elements, or successive values for NDJSON/concatenated input).
+    After (or during) iteration, `mode` is "array" or "stream" and
+    `quarantined` lists the (start, end) character offsets that were dropped.
+    """
+    def __init__(self, fp, chunk_size: int = CHUNK_SIZE):
+        self.quarantined: List[Tuple[int, int]] = []
+        self.mode: Optional[str] = None
+        self._reader = _Reader(fp, chunk_size)
+    def __iter__(self) -> Iterator[Any]:
+        reader = self._reader
+        if not reader.skip_ws():
+            return
+        if reader.buf[reader.pos] == "[":
+            self.mode = "array"
+            yield from _iter_array(reader, self.quarantined)
+        else:
+            self.mode = "stream"
+            yield from _iter_stream(reader, self.quarantined)
+def salvage(source, chunk_size: int = CHUNK_SIZE) -> SalvageResult:
+    """Salvage a str or text stream in one go."""
+    salvager = Salvager(io.StringIO(source) if isinstance(source, str) else source, chunk_size)
+    records = list(salvager)
+    return SalvageResult(records, salvager.quarantined, salvager.mode or "stream")
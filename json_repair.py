@@ -0,0 +1,262 @@
+"""
+Text-level repair of almost-JSON input (Python literals, comments, single
+quotes, trailing commas, unquoted keys, a missing outer brace).
+
+Shared by the repair viewer and the worker daemon; nothing here imports
+tkinter.
+
+A huge top-level array can be repaired in parallel instead: the text is cut
+at top-level element boundaries (found by a scan that skips strings in
+either quote style and comments), every chunk is repaired and validated as
+an array of its own in a process pool, and the results are joined back in
+order. Reports and failures stay per chunk.
+
+    python json_repair.py broken.json [fixed.json] [--workers N]
+"""
+import json
+import re
+import sys
+from typing import Callable, List, NamedTuple, Optional, Tuple
+import json_backend
+_COMMENT_RE = re.compile(r'("(?:\\.|[^"\\])*")|(//.*)|(/\*[\s\S]*?\*/)', re.DOTALL)
+_QUOTED_RE = re.compile(r'("(?:\\.|[^"\\])*")|(\'(?:\\.|[^\'\\])*\')')
+def parse_error(s: str, parsed: Optional[list] = None) -> Optional[json_backend.JSONDecodeError]:
+    """Tries to parse a string, returns the error if it fails. On success the
+    document is appended to `parsed`, if given, so callers parse only once."""
+    try:
+        value = json_backend.loads(s)
+        if parsed is not None:
+            parsed.append(value)
+        return None
+    except json_backend.JSONDecodeError as e:
+        return e
+    except Exception:
+        return None
+# Every object collapses to its key count the moment it has been scanned, so
+# no document graph is kept; grammar and error positions are the stdlib's.
+_DISCARD_DECODER = json.JSONDecoder(object_pairs_hook=len)
+# A top-level array of scalars (which the decoder would keep in one list) is
+# scanned this many characters at a time; of records, it keeps only their
+# key counts.
+SCAN_CHUNK_CHARS = 1 << 20
+def _discard_error(s: str) -> Optional[json_backend.JSONDecodeError]:
+    try:
+        _DISCARD_DECODER.decode(s)
+        return None
+    except json_backend.JSONDecodeError as e:
+        return e
+    except Exception:
+        return None
+def scan_error(s: str) -> Optional[json_backend.JSONDecodeError]:
+    """Like parse_error, but without building the document: for callers
+    that keep only the text (the viewer's compact mode)."""
+    lead = _LEAD_RE.match(s).end()
+    first = _LEAD_RE.match(s, lead + 1).end()
+    if not s.startswith("[", lead) or s[first:first + 1] in ("{", "["):
+        return _discard_error(s)
+    spans = split_array(s, SCAN_CHUNK_CHARS)
+    if spans is None or len(spans) == 1 or spans[-1][1] == len(s):  # not one closed array
+        return _discard_error(s)
+    for a, b in spans:
+        if _LEAD_RE.match(s, a, b).end() == b:  # nothing between two commas
+            return json_backend.JSONDecodeError("Expecting value", s, a)
+        error = _discard_error("[" + s[a:b] + "]")
+        if error:
+            return json_backend.JSONDecodeError(error.msg, s, min(a + error.pos - 1, b))
+    return None
+def strip_json_comments(s: str) -> str:
+    return _COMMENT_RE.sub(lambda m: m.group(1) or "", s)
+def normalize_single_quotes(s: str) -> str:
+    def repl(m):
+        if m.group(1): return m.group(1)
+        inner = m.group(2)[1:-1]
+        inner = inner.replace('\\"', '"').replace("\\'", "'")
+        inner = inner.replace('"', '\\"')
+        return f'"{inner}"'
+    return _QUOTED_RE.sub(repl, s)
+def remove_trailing_commas(s: str) -> str:
+    return re.sub(r',\s*([\]}])', r'\1', s)
+def quote_unquoted_keys(s: str) -> str:
+    return re.sub(r'(?<=[\{\,])\s*([a-zA-Z_][a-zA-Z0-9_\-]*)\s*(?=:)', r' "\1"', s)
+def fix_keywords(s: str) -> str:
+    """Converts Python None/True/False to JSON null/true/false."""
+    s = re.sub(r'\bNone\b', 'null', s)
+    s = re.sub(r'\bTrue\b', 'true', s)
+    s = re.sub(r'\bFalse\b', 'false', s)
+    return s
+def fix_nan_inf(s: str) -> str:
+    """Converts NaN/Infinity to null."""
+    return re.sub(r'\b(NaN|Infinity|-Infinity)\b', 'null', s)
+REPAIR_STEPS: List[Tuple[Callable[[str], str], str]] = [
+    (fix_keywords, "fixed Python keywords (None/True/False)"),
+    (fix_nan_inf, "converted NaN/Infinity to null"),
+    (strip_json_comments, "removed comments"),
+    (normalize_single_quotes, "normalized single quotes"),
+    (remove_trailing_commas, "removed trailing commas"),
+    (quote_unquoted_keys, "quoted unquoted keys"),
+]
+def repair_pipeline(text: str, parsed: Optional[list] = None,
+                    check: Optional[Callable[[str], Optional[json_backend.JSONDecodeError]]] = None
+                    ) -> Tuple[Optional[str], List[str]]:
+    """Applies the repair steps in order until the text parses. Returns the
+    repaired text and the steps that changed it, or (None, []) on failure.
+    The document from the successful parse is appended to `parsed`, unless
+    `check` (e.g. scan_error) validates the candidates instead."""
+    if check is None:
+        check = lambda s: parse_error(s, parsed)
+    report = []
+    if not check(text):
+        return text, ["already valid"]
+    current = text
+    for func, msg in REPAIR_STEPS:
+        candidate = func(current)
+        if candidate == current:
+            continue  # already known not to parse
+        report.append(msg)
+        if not check(candidate):
+            return candidate, report
+        current = candidate
+    stripped = current.strip()
+    if not stripped.startswith(('{', '[')) and re.search(r"^\s*[a-zA-Z_]", stripped, re.M):
+        wrapped = "{\n" + stripped + "\n}"
+        if not check(wrapped):
+            report.append("wrapped in {}")
+            return wrapped, report
+    return None, []
+# Target size of one chunk in the parallel repair of a top-level array.
+CHUNK_CHARS = 8 << 20
+# Skips strings (double or single quoted), comments and other text, stopping
+# at the next bracket. A quote without a closing partner is skipped like any
+# other character. At the top level, _COMMA_RUN_RE first steps over up to 256
+# elements at a time, ending just past a comma; _COMMA_RE takes one.
+_SKIP = r"""(?:[^"'/\[\]{}%s]++|"(?:[^"\\]|\\.)*+"|'(?:[^'\\]|\\.)*+'|//[^\n]*+|/\*[\s\S]*?\*/|["'/])*+"""
+_BRACKET_SCAN_RE = re.compile(_SKIP % "" + r"([\[\]{}])")
+_COMMA_RUN_RE = re.compile(r"(?:" + _SKIP % "," + r",){1,256}")
+_COMMA_RE = re.compile(_SKIP % "," + ",")
+_LEAD_RE = re.compile(r"(?:\s++|//[^\n]*+|/\*[\s\S]*?\*/)*+")
+class ChunkReport(NamedTuple):
+    index: int
+    start: int            # offsets of the chunk in the input text
+    end: int
+    report: List[str]     # repair steps applied to this chunk
+    error: Optional[str]  # why the chunk could not be repaired
+def split_array(text: str, chunk_chars: int = CHUNK_CHARS) -> Optional[List[Tuple[int, int]]]:
+    """
+    (start, end) spans of roughly `chunk_chars` each that together hold the
+    elements of the top-level array in `text`, cut only at top-level commas
+    (which are left out). None when the text is not a single array.
+    """
+    lead = _LEAD_RE.match(text).end()
+    if not text.startswith("[", lead):
+        return None
+    spans = []
+    depth, pos, start = 1, lead + 1, lead + 1
+    target = start + chunk_chars
+    while True:
+        if depth == 1:
+            run = _COMMA_RUN_RE.match(text, pos)
+            if run is not None:
+                if run.end() - 1 < target:
+                    pos = run.end()
+                    continue
+                pos = _COMMA_RE.match(text, pos).end()  # cut at the first comma past the target
+                while pos - 1 < target:
+                    pos = _COMMA_RE.match(text, pos).end()
+                spans.append((start, pos - 1))
+                start = pos
+                target = start + chunk_chars
+                continue
+        m = _BRACKET_SCAN_RE.match(text, pos)  # at the top level, no comma comes first
+        if m is None:  # end of text: unterminated array
+            spans.append((start, len(text)))
+            return spans
+        pos = m.end()
+        ch = m.group(1)
+        if ch in "[{":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                spans.append((start, pos - 1))
+                return spans if not text[_LEAD_RE.match(text, pos).end():].strip() else None
+_shared_text = ""
+def _share_text(text: str):
+    # Pool initializer: with fork the text is inherited, not pickled per chunk.
+    global _shared_text
+    _shared_text = text
+def _repair_span(span: Tuple[int, int]) -> Tuple[Optional[str], List[str], Optional[str]]:
+    return repair_chunk(_shared_text[span[0]:span[1]])
+def _describe_error(text: str) -> str:
+    error = parse_error(text)
+    return f"{error.msg} (line {error.lineno}, col {error.colno})" if error else "could not repair"
+def repair_chunk(chunk: str) -> Tuple[Optional[str], List[str], Optional[str]]:
+    """Repairs a run of array elements; returns (elements as valid JSON,
+    report, error). Blank chunks repair to ""."""
+    if not _LEAD_RE.match(chunk).end() < len(chunk):
+        return "", [], None
+    repaired, report = repair_pipeline("[" + chunk + "\n]")
+    if repaired is None:
+        return None, [], _describe_error("[" + chunk + "\n]")
+    body = repaired.strip()[1:-1].strip()
+    return body, [] if report == ["already valid"] else report, None
+def repair_array_parallel(text: str, workers: Optional[int] = None, chunk_chars: int = CHUNK_CHARS,
+                          executor=None,
+                          drop_failed: bool = False) -> Tuple[Optional[str], List[ChunkReport]]:
+    """
+    Repairs a top-level array chunk by chunk in a process pool (`executor`,
+    or a new one with `workers` processes). Returns the repaired text and a
+    report per chunk; the text is None if a chunk failed, unless
+    `drop_failed` leaves failed chunks out. Input that is not one array
+    goes through repair_pipeline as a single chunk.
+    """
+    from concurrent.futures import ProcessPoolExecutor  # imports multiprocessing; only needed here
+    spans = split_array(text, chunk_chars)
+    if spans is None or len(spans) == 1:
+        repaired, report = repair_pipeline(text.strip())
+        error = None if repaired is not None else _describe_error(text)
+        return repaired, [ChunkReport(0, 0, len(text), report, error)]
+    if executor is not None:
+        results = executor.map(repair_chunk, (text[a:b] for a, b in spans))
+    else:
+        own = ProcessPoolExecutor(workers, initializer=_share_text, initargs=(text,))
+        results = own.map(_repair_span, spans)
+    try:
+        parts, reports = [], []
+        for n, ((a, b), (body, report, error)) in enumerate(zip(spans, results)):
+            reports.append(ChunkReport(n, a, b, report, error))
+            if body:
+                parts.append(body)
+    finally:
+        if executor is None:
+            own.shutdown()
+    if not drop_failed and any(r.error for r in reports):
+        return None, reports
+    return "[\n" + ",\n".join(parts) + "\n]", reports
+def main(argv=None) -> int:
+    import argparse
+    import json_io
+    parser = argparse.ArgumentParser(description="Repair a huge top-level JSON array in parallel chunks.")
+    parser.add_argument("input")
+    parser.add_argument("output", nargs="?", help="where to write the result (default: stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--chunk-mb", type=float, default=CHUNK_CHARS / (1 << 20), help="target chunk size")
+    parser.add_argument("--drop-failed", action="store_true", help="write the other chunks when some fail")
+    args = parser.parse_args(argv)
+    repaired, reports = repair_array_parallel(json_io.read_text(args.input), workers=args.workers,
+                                              chunk_chars=int(args.chunk_mb * (1 << 20)),
+                                              drop_failed=args.drop_failed)
+    for r in reports:
+        if r.error:
+            print(f"chunk {r.index} [{r.start}:{r.end}] failed: {r.error}", file=sys.stderr)
+        elif r.report:
+            print(f"chunk {r.index}: {', '.join(r.report)}", file=sys.stderr)
+    if repaired is None:
+        return 1
+    if args.output:
+        with json_io.open_text(args.output, "w") as f:
+            f.write(repaired)
+    else:
+        sys.stdout.write(repaired)
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
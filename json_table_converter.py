@@ -1,142 +1,417 @@
-import json
-import csv
-import io
-import sqlite3
 import re
+import queue
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 from tkinter import font as tkfont
-USING_TTKBS = False
-try:
-    import ttkbootstrap as tb
-    USING_TTKBS = True
-except Exception:
-    USING_TTKBS = False
-def flatten_dict(d, parent_key="", sep="."):
-    items = []
-    if isinstance(d, dict):
-        for k, v in d.items():
-            new_key = f"{parent_key}{sep}{k}" if parent_key else k
-            items.extend(flatten_dict(v, new_key, sep=sep).items())
-    elif isinstance(d, list):
-        for idx, v in enumerate(d):
-            new_key = f"{parent_key}{sep}{idx}" if parent_key else str(idx)
-            items.extend(flatten_dict(v, new_key, sep=sep).items())
-    else:
-        items.append((parent_key, d))
-    return dict(items)
-def infer_records(obj):
-    if isinstance(obj, list):
-        if all(isinstance(x, dict) for x in obj):
-            return obj
-        return [{"value": x} for x in obj]
-    if isinstance(obj, dict):
-        for v in obj.values():
-            if isinstance(v, list):
-                if all(isinstance(x, dict) for x in v):
-                    return v
-                return [{"value": x} for x in v]
-        return [obj]
-    return [{"value": obj}]
-def json_to_csv_text(json_text, sep="."):
-    data = json.loads(json_text)
-    records = infer_records(data)
-    flat_rows = [flatten_dict(r, sep=sep) for r in records]
-    headers = sorted({k for r in flat_rows for k in r.keys()})
-    out = io.StringIO()
-    writer = csv.DictWriter(out, fieldnames=headers, extrasaction="ignore")
-    writer.writeheader()
-    for r in flat_rows:
-        row = {k: r.get(k, "") for k in headers}
-        writer.writerow(row)
-    return out.getvalue()
-_SQL_IDENT_RE = re.compile(r"[^A-Za-z0-9_]")
-def _sql_ident(name: str) -> str:
-    safe = _SQL_IDENT_RE.sub("_", name.strip() or "col")
-    return f"\"{safe}\""
-def _infer_sql_type(values):
+from json_tables import (  # re-exported: the library half used to live here
+    PREVIEW_ROWS, GRID_TABLE, QUERY_TABLE, QUERY_INDEX_MIN_ROWS, RowStore, flatten_dict, infer_records,
+    json_to_csv_text, json_to_csv_file, csv_preview, json_to_sqlite, stage_rows_sqlite, stage_query_table,
+    index_candidates, _flatten_json, _csv_preview_rows, _sql_ident,
+)
+_FILTER_RE = re.compile(r"^\s*(>=|<=|!=|=|>|<|~)?\s*(.*?)\s*$")
+_NUMERIC_SQL_TYPES = ("INTEGER", "REAL", "BOOLEAN")
+def _like_pattern(text: str) -> str:
+    """`%text%` for LIKE ... ESCAPE '\\', with the user's own % and _ literal."""
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+def _coerce_filter_value(text: str):
+    for conv in (int, float):
+        try:
+            return conv(text)
+        except ValueError:
+            pass
+    return text
+def _memory_db():
+    import sqlite3  # deferred until the first rows are staged
+    return sqlite3.connect(":memory:")
+class QueryConsole(ttk.Frame):
     """
-    Infer a SQLite column type (INTEGER, REAL, TEXT) from a sequence of values.
-    Booleans become INTEGER (0/1). None is ignored.
+    SQL console over the converted rows. It queries the grid's in-memory
+    table through a view `data` with the named, typed columns, so the rows
+    are staged once for both (the view is read-only); columns a query
+    filters, sorts or groups on are indexed the first time they are used,
+    and results are fetched a page at a time from the open cursor.
     """
-    saw_real = False
-    saw_int = False
-    for v in values:
-        if v is None:
-            continue
-        if isinstance(v, bool):
-            saw_int = True
-            continue
-        if isinstance(v, int):
-            saw_int = True
-            continue
-        if isinstance(v, float):
-            saw_real = True
-            continue
-        return "TEXT"
-    if saw_real and not saw_int:
-        return "REAL"
-    if saw_real and saw_int:
-        return "REAL"
-    if saw_int:
-        return "INTEGER"
-    return "TEXT"
-def json_to_sqlite(json_text, db_path: str, table_name: str, sep="."):
-    data = json.loads(json_text)
-    records = infer_records(data)
-    flat_rows = [flatten_dict(r, sep=sep) for r in records]
-    if not flat_rows:
-        raise ValueError("No rows to write.")
-    headers = sorted({k for r in flat_rows for k in r.keys()})
-    col_values = {h: [] for h in headers}
-    for r in flat_rows:
-        for h in headers:
-            v = r.get(h, None)
-            if v == "":
-                v = None
-            col_values[h].append(v)
-    col_types = {h: _infer_sql_type(col_values[h]) for h in headers}
-    quoted_cols = [_sql_ident(h) for h in headers]
-    col_defs = [f"{quoted_cols[i]} {col_types[headers[i]]}" for i in range(len(headers))]
-    placeholders = ", ".join(["?"] * len(headers))
-    insert_sql = f"INSERT INTO {_sql_ident(table_name)} ({', '.join(quoted_cols)}) VALUES ({placeholders})"
-    conn = sqlite3.connect(db_path)
-    try:
-        cur = conn.cursor()
-        cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?;", (table_name,))
-        exists = cur.fetchone() is not None
-        if exists:
-            replace = messagebox.askyesno(
-                "Table Exists",
-                f"Table '{table_name}' already exists in:\n{db_path}\n\nReplace it? (Yes = DROP & CREATE, No = append)"
-            )
-            if replace:
-                cur.execute(f"DROP TABLE {_sql_ident(table_name)}")
-        if (not exists) or replace:
-            cur.execute(f"CREATE TABLE {_sql_ident(table_name)} ({', '.join(col_defs)})")
-        rows = []
-        for r in flat_rows:
-            row = []
-            for h in headers:
-                v = r.get(h, None)
-                if v == "":
-                    v = None
-                if isinstance(v, bool):
-                    v = 1 if v else 0
-                row.append(v)
-            rows.append(tuple(row))
-        cur.executemany(insert_sql, rows)
-        conn.commit()
-    finally:
-        conn.close()
+    PAGE_ROWS = 200
+    def __init__(self, master, grid: "RowGrid"):
+        super().__init__(master)
+        self.grid_view = grid  # stages the rows and owns the connection
+        self.conn = None
+        self.stale = False  # a new conversion has not been staged for queries yet
+        self.columns = []   # json_profile.ColumnProfile per column
+        self.total = 0
+        self.cursor = None  # query with rows still to fetch
+        self.shown = 0
+        self._build()
+    def _build(self):
+        self.columnconfigure(1, weight=1)
+        self.rowconfigure(2, weight=1)
+        bar = ttk.Frame(self)
+        bar.grid(row=0, column=0, columnspan=3, sticky="ew", pady=(0, 6))
+        bar.columnconfigure(2, weight=1)
+        ttk.Button(bar, text="Run ▶", command=self.run).grid(row=0, column=0, padx=(0, 6))
+        self.more_btn = ttk.Button(bar, text="More rows", command=self.fetch_more, state="disabled")
+        self.more_btn.grid(row=0, column=1)
+        self.info = ttk.Label(bar, text="", anchor="e")
+        self.info.grid(row=0, column=2, sticky="e")
+        self.sql_text = tk.Text(self, height=4, wrap="word", undo=True)
+        self.sql_text.grid(row=1, column=0, columnspan=3, sticky="ew", pady=(0, 6))
+        self.sql_text.insert("1.0", f"SELECT * FROM {QUERY_TABLE} LIMIT 100")
+        self.sql_text.bind("<Control-Return>", lambda e: (self.run(), "break")[1])
+        self.col_list = tk.Listbox(self, width=40, exportselection=False)
+        self.col_list.grid(row=2, column=0, sticky="ns", padx=(0, 6))
+        self.col_list.bind("<Double-Button-1>", self._insert_column)
+        self.tree = ttk.Treeview(self, show="headings", selectmode="browse")
+        self.tree.grid(row=2, column=1, sticky="nsew")
+        y = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        x = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(yscrollcommand=y.set, xscrollcommand=x.set)
+        y.grid(row=2, column=2, sticky="ns")
+        x.grid(row=3, column=1, sticky="ew")
+    def load(self, store):
+        """Takes the rows of a new conversion; they are staged on first use."""
+        self.stale = True
+        self.total = len(store)
+        self.cursor = None
+        self.more_btn.config(state="disabled")
+        self.tree.delete(*self.tree.get_children())
+        self.col_list.delete(0, "end")
+        self.info.config(text=f"{len(store):,} rows ready to query" if len(store) else "")
+    def clear(self):
+        self.load(RowStore())
+    def ensure_staged(self):
+        if not self.stale:
+            return
+        self.stale = False
+        self.cursor = None
+        self.grid_view.ensure_staged()
+        self.conn = self.grid_view.conn
+        self.columns = self.grid_view.profiles
+        if not self.columns:
+            self.total = 0
+        self.col_list.delete(0, "end")
+        for p in self.columns:
+            self.col_list.insert("end", f"{p.name}  ({p.describe()})")
+    def _insert_column(self, _):
+        sel = self.col_list.curselection()
+        if sel:
+            self.sql_text.insert("insert", _sql_ident(self.columns[sel[0]].name))
+    def _ensure_indexes(self, sql):
+        if self.total < QUERY_INDEX_MIN_ROWS:
+            return
+        names = [p.name for p in self.columns]
+        for col in index_candidates(sql, names):
+            self.grid_view.ensure_index(names.index(col))  # on the grid table behind the view
+    def run(self):
+        sql = self.sql_text.get("1.0", "end").strip()
+        if not sql:
+            return
+        self.ensure_staged()
+        if self.conn is None:
+            self.info.config(text="Convert some JSON first.")
+            return
+        started = time.perf_counter()
+        try:
+            self._ensure_indexes(sql)
+            cur = self.conn.execute(sql)
+        except self.conn.Error as e:
+            self.info.config(text=f"SQL error: {e}")
+            return
+        self.tree.delete(*self.tree.get_children())
+        self.shown = 0
+        if cur.description is None:  # not a query
+            self.conn.commit()
+            self.cursor = None
+            self.more_btn.config(state="disabled")
+            self.info.config(text=f"Done ({cur.rowcount:,} rows changed)")
+            return
+        ids = tuple(f"r{i}" for i in range(len(cur.description)))
+        self.tree.config(columns=ids)
+        for cid, d in zip(ids, cur.description):
+            self.tree.heading(cid, text=d[0])
+            self.tree.column(cid, width=120, stretch=False)
+        self.cursor = cur
+        self.fetch_more(started)
+    def fetch_more(self, started=None):
+        if self.cursor is None:
+            return
+        started = started or time.perf_counter()
+        try:
+            rows = self.cursor.fetchmany(self.PAGE_ROWS)
+        except self.conn.Error as e:
+            self.cursor = None
+            self.info.config(text=f"SQL error: {e}")
+            return
+        for r in rows:
+            self.tree.insert("", "end", values=["" if v is None else v for v in r])
+        self.shown += len(rows)
+        ms = (time.perf_counter() - started) * 1000
+        if len(rows) < self.PAGE_ROWS:
+            self.cursor = None
+            self.more_btn.config(state="disabled")
+            self.info.config(text=f"{self.shown:,} rows ({ms:.1f} ms)")
+        else:
+            self.more_btn.config(state="normal")
+            self.info.config(text=f"First {self.shown:,} rows ({ms:.1f} ms)")
+class RowGrid(ttk.Frame):
+    """
+    Virtualized table view. Rows live in an in-memory SQLite table and only
+    the rows and columns currently in view are materialized as Treeview items,
+    so scrolling, sorting and filtering cost one indexed query per redraw.
+    Sorted or filtered pages are found by keyset from the nearest known row
+    (the start, the end, or the top of the current page), so scrolling deep
+    into a large view does not re-read everything above it.
+    Rows are staged when the grid is first shown, not on every conversion.
+    Filter syntax: `text` (contains), or `=`, `!=`, `>`, `>=`, `<`, `<=` followed by a value;
+    the value is a number for numeric columns and text otherwise.
+    """
+    MAX_VISIBLE_COLS = 40
+    def __init__(self, master):
+        super().__init__(master)
+        self.conn = None    # opened by the first staging
+        self.store = None   # rows waiting to be staged
+        self.headers = []
+        self.profiles = []  # json_profile.ColumnProfile per column
+        self.types = []     # declared SQL type per column
+        self.total = 0
+        self.offset = 0
+        self.col_offset = 0
+        self.page_size = 30
+        self.sort_col = None
+        self.sort_desc = False
+        self.where_sql = ""  # filter condition, without WHERE
+        self.where_args = ()
+        self._anchor = None  # (offset, sort key, rowid) of the top row shown
+        self._indexed = set()
+        self.filter_var = tk.StringVar()
+        self._build()
+    def _build(self):
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+        bar = ttk.Frame(self)
+        bar.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 6))
+        bar.columnconfigure(4, weight=1)
+        ttk.Label(bar, text="Filter:").grid(row=0, column=0, padx=(0, 4))
+        self.filter_col = ttk.Combobox(bar, state="readonly", width=24)
+        self.filter_col.grid(row=0, column=1, padx=(0, 4))
+        entry = ttk.Entry(bar, textvariable=self.filter_var, width=20)
+        entry.grid(row=0, column=2, sticky="w")
+        entry.bind("<Return>", lambda e: self.apply_filter())
+        ttk.Button(bar, text="Apply", command=self.apply_filter).grid(row=0, column=3, padx=6, sticky="w")
+        self.info = ttk.Label(bar, text="", anchor="e")
+        self.info.grid(row=0, column=4, sticky="e")
+        self.tree = ttk.Treeview(self, show="headings", selectmode="browse")
+        self.tree.grid(row=1, column=0, sticky="nsew")
+        self.vscroll = ttk.Scrollbar(self, orient="vertical", command=self._on_yscroll)
+        self.vscroll.grid(row=1, column=1, sticky="ns")
+        self.hscroll = ttk.Scrollbar(self, orient="horizontal", command=self._on_xscroll)
+        self.hscroll.grid(row=2, column=0, sticky="ew")
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_rows(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_rows(3))
+    def load(self, store):
+        """Takes the rows of a new conversion; they are staged on first view."""
+        self.store = store
+        self.headers = store.headers
+        self.profiles = []
+        self.types = []
+        self.total = len(store)
+        self.offset = 0
+        self.col_offset = 0
+        self.sort_col = None
+        self.sort_desc = False
+        self.where_sql = ""
+        self.where_args = ()
+        self._anchor = None
+        self._indexed = set()
+        self.filter_col.config(values=self.headers)
+        self.filter_col.set(self.headers[0] if self.headers else "")
+        self.filter_var.set("")
+        self.tree.delete(*self.tree.get_children())
+        self.info.config(text=f"{self.total:,} rows" if self.total else "")
+        if self.winfo_viewable():
+            self.ensure_staged()
+    def clear(self):
+        self.load(RowStore())
+    def ensure_staged(self):
+        if self.store is None:
+            return
+        store, self.store = self.store, None
+        if self.conn is None:
+            self.conn = _memory_db()
+        self.profiles = stage_rows_sqlite(self.conn, store, view=QUERY_TABLE)
+        self.types = [p.sql_type for p in self.profiles]
+        self.refresh()
+    def ensure_index(self, col):
+        if col in self._indexed:
+            return
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS ix_c{col} ON {_sql_ident(GRID_TABLE)} (c{col})")
+        self._indexed.add(col)
+    def sort_by(self, col):
+        self.ensure_staged()
+        if self.sort_col == col:
+            self.sort_desc = not self.sort_desc
+        else:
+            self.sort_col = col
+            self.sort_desc = False
+        self.ensure_index(col)
+        self.offset = 0
+        self._anchor = None
+        self.refresh()
+    def apply_filter(self):
+        self.ensure_staged()
+        text = self.filter_var.get().strip()
+        col = self.filter_col.current()
+        if not text or col < 0:
+            self.where_sql, self.where_args = "", ()
+        else:
+            op, value = _FILTER_RE.match(text).groups()
+            if not op or op == "~":
+                self.where_sql, self.where_args = f"c{col} LIKE ? ESCAPE '\\'", (_like_pattern(value),)
+            elif self.types[col] == "BLOB":  # strings and numbers mixed: compare as text
+                self.where_sql, self.where_args = f"CAST(c{col} AS TEXT) {op} ?", (value,)
+            else:
+                self.ensure_index(col)
+                if self.types[col] in _NUMERIC_SQL_TYPES:
+                    value = _coerce_filter_value(value)
+                self.where_sql, self.where_args = f"c{col} {op} ?", (value,)
+        if self.where_sql:
+            sql = f"SELECT COUNT(*) FROM {_sql_ident(GRID_TABLE)} WHERE {self.where_sql}"
+            self.total = self.conn.execute(sql, self.where_args).fetchone()[0]
+        else:
+            self.total = self.conn.execute(f"SELECT COUNT(*) FROM {_sql_ident(GRID_TABLE)}").fetchone()[0] if self.headers else 0
+        self.offset = 0
+        self._anchor = None
+        self.refresh()
+    def _order(self, forward):
+        """ORDER BY reading the current sort forward, or backward."""
+        direction = "DESC" if self.sort_desc == forward else "ASC"
+        if self.sort_col is None:
+            return f"ORDER BY rowid {direction}"
+        return f"ORDER BY c{self.sort_col} {direction}, rowid {direction}"
+    def _beyond(self, key, rowid, forward, inclusive):
+        """Condition and args for the rows after (or before) the row
+        (key, rowid) in the current sort. NULLs sort first, as in SQLite."""
+        up = forward != self.sort_desc  # towards larger keys
+        cmp = (">" if up else "<") + ("=" if inclusive else "")
+        if self.sort_col is None:
+            return f"rowid {cmp} ?", (rowid,)
+        c = f"c{self.sort_col}"
+        if key is None:
+            if up:
+                return f"({c} IS NOT NULL OR {c} IS NULL AND rowid {cmp} ?)", (rowid,)
+            return f"{c} IS NULL AND rowid {cmp} ?", (rowid,)
+        if up:
+            return f"{c} >= ? AND ({c} > ? OR rowid {cmp} ?)", (key, key, rowid)
+        return f"({c} IS NULL OR {c} <= ? AND ({c} < ? OR rowid {cmp} ?))", (key, key, rowid)
+    def _select(self, what, forward, seek=None, limit=1, skip=0):
+        terms, args = ([self.where_sql], list(self.where_args)) if self.where_sql else ([], [])
+        if seek is not None:
+            term, seek_args = self._beyond(seek[0], seek[1], forward, seek[2])
+            terms.append(term)
+            args.extend(seek_args)
+        where = f"WHERE {' AND '.join(terms)}" if terms else ""
+        sql = f"SELECT {what} FROM {_sql_ident(GRID_TABLE)} {where} {self._order(forward)} LIMIT ? OFFSET ?"
+        return self.conn.execute(sql, (*args, limit, skip)).fetchall()
+    def _locate(self, offset):
+        """(sort key, rowid) of the row at `offset`, read from whichever known
+        row is nearest: the first, the last or the top of the current page."""
+        reads = [(offset, True, None), (self.total - 1 - offset, False, None)]
+        if self._anchor is not None:
+            top, key, rowid = self._anchor
+            if offset >= top:
+                reads.append((offset - top, True, (key, rowid, True)))
+            else:
+                reads.append((top - offset - 1, False, (key, rowid, False)))
+        skip, forward, seek = min(reads, key=lambda r: r[0])
+        key = "NULL" if self.sort_col is None else f"c{self.sort_col}"
+        rows = self._select(f"{key}, rowid", forward, seek, skip=skip)
+        return rows[0] if rows else None
+    def _fetch(self, visible):
+        if not visible:
+            return []
+        cols = ", ".join(f"c{i}" for i in visible)
+        if self.sort_col is None and not self.where_sql:
+            # rowids are dense 1..N after staging, so paging is an index seek.
+            sql = f"SELECT {cols} FROM {_sql_ident(GRID_TABLE)} WHERE rowid > ? ORDER BY rowid LIMIT ?"
+            return self.conn.execute(sql, (self.offset, self.page_size)).fetchall()
+        top = self._locate(self.offset)
+        if top is None:
+            self._anchor = None
+            return []
+        self._anchor = (self.offset, *top)
+        return self._select(cols, True, (*top, True), limit=self.page_size)
+    def refresh(self):
+        if self.store is not None:
+            return  # not staged yet; ensure_staged refreshes
+        self.offset = max(0, min(self.offset, self.total - self.page_size))
+        ncols = len(self.headers)
+        self.col_offset = max(0, min(self.col_offset, ncols - self.MAX_VISIBLE_COLS))
+        visible = list(range(self.col_offset, min(ncols, self.col_offset + self.MAX_VISIBLE_COLS)))
+        ids = tuple(f"c{i}" for i in visible)
+        if tuple(self.tree["columns"]) != ids:
+            self.tree.config(columns=ids)
+        for i in visible:
+            label = self.headers[i]
+            if self.sort_col == i:
+                label += " ▼" if self.sort_desc else " ▲"
+            self.tree.heading(f"c{i}", text=label, command=lambda c=i: self.sort_by(c))
+            self.tree.column(f"c{i}", width=120, stretch=False)
+        self.tree.delete(*self.tree.get_children())
+        rows = self._fetch(visible)
+        for r in rows:
+            self.tree.insert("", "end", values=["" if v is None else v for v in r])
+        if self.total:
+            self.vscroll.set(self.offset / self.total, (self.offset + len(rows)) / self.total)
+            info = f"Rows {self.offset + 1:,}–{self.offset + len(rows):,} of {self.total:,}"
+        else:
+            self.vscroll.set(0, 1)
+            info = "No rows"
+        if len(visible) < ncols:  # the rest are reached with the horizontal scrollbar
+            info += f"   columns {visible[0] + 1:,}–{visible[-1] + 1:,} of {ncols:,}"
+        self.info.config(text=info)
+        if ncols:
+            self.hscroll.set(self.col_offset / ncols, (self.col_offset + len(visible)) / ncols)
+        else:
+            self.hscroll.set(0, 1)
+    def _on_resize(self, event):
+        rowheight = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        rows = max(1, (event.height - 24) // rowheight)
+        if rows != self.page_size:
+            self.page_size = rows
+            self.refresh()
+    def _scroll_rows(self, delta):
+        self.offset += delta
+        self.refresh()
+    def _on_wheel(self, event):
+        self._scroll_rows(-3 if event.delta > 0 else 3)
+        return "break"
+    def _on_yscroll(self, *args):
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * self.total)
+        elif args[0] == "scroll":
+            self.offset += int(args[1]) * (self.page_size if args[2] == "pages" else 1)
+        self.refresh()
+    def _on_xscroll(self, *args):
+        if args[0] == "moveto":
+            self.col_offset = int(float(args[1]) * len(self.headers))
+        elif args[0] == "scroll":
+            self.col_offset += int(args[1]) * (self.MAX_VISIBLE_COLS if args[2] == "pages" else 1)
+        self.refresh()
 class JsonToCsvApp(ttk.Frame):
     def __init__(self, master):
         super().__init__(master)
         self.master: tk.Tk = master
         self.sep_var = tk.StringVar(value=".")
         self.autoconvert_var = tk.BooleanVar(value=False)
+        self.salvage_var = tk.BooleanVar(value=False)
         self._last_open_dir = ""
         self._last_save_dir = ""
+        self._preview_truncated = False
+        self._export_thread = None
+        self._export_queue = queue.Queue()
         self._init_fonts_and_styles()
         self._build_ui()
         self._bind_keys()
@@ -159,7 +434,7 @@ class JsonToCsvApp(ttk.Frame):
         self.rowconfigure(1, weight=1)
         header = ttk.Frame(self, padding=(10, 10, 10, 8))
         header.grid(row=0, column=0, sticky="ew")
-        header.columnconfigure(10, weight=1)
+        header.columnconfigure(11, weight=1)
         ttk.Label(header, text="JSON → CSV / SQLite", style="AppTitle.TLabel").grid(
             row=0, column=0, padx=(0, 12), sticky="w"
         )
@@ -167,15 +442,18 @@ class JsonToCsvApp(ttk.Frame):
         sep_entry = ttk.Entry(header, width=4, textvariable=self.sep_var, justify="center")
         sep_entry.grid(row=0, column=2, sticky="w")
         ttk.Checkbutton(header, text="Auto-convert on paste", variable=self.autoconvert_var).grid(
-            row=0, column=3, padx=12
+            row=0, column=3, padx=(12, 0)
+        )
+        ttk.Checkbutton(header, text="Salvage corrupt input", variable=self.salvage_var).grid(
+            row=0, column=4, padx=12
         )
-        ttk.Button(header, text="Import JSON", command=self.on_import_json).grid(row=0, column=4, padx=6, sticky="e")
-        ttk.Button(header, text="Paste JSON", command=self.on_paste_json).grid(row=0, column=5, padx=6, sticky="e")
-        ttk.Button(header, text="Convert ▶", command=self.on_convert).grid(row=0, column=6, padx=6, sticky="e")
-        ttk.Button(header, text="Copy CSV", command=self.on_copy_csv).grid(row=0, column=7, padx=6, sticky="e")
-        ttk.Button(header, text="Export CSV", command=self.on_export_csv).grid(row=0, column=8, padx=6, sticky="e")
-        ttk.Button(header, text="Export SQLite", command=self.on_export_sqlite).grid(row=0, column=9, padx=6, sticky="e")
-        ttk.Button(header, text="Clear", command=self.on_clear).grid(row=0, column=10, padx=(6, 0), sticky="e")
+        ttk.Button(header, text="Import JSON", command=self.on_import_json).grid(row=0, column=5, padx=6, sticky="e")
+        ttk.Button(header, text="Paste JSON", command=self.on_paste_json).grid(row=0, column=6, padx=6, sticky="e")
+        ttk.Button(header, text="Convert ▶", command=self.on_convert).grid(row=0, column=7, padx=6, sticky="e")
+        ttk.Button(header, text="Copy CSV", command=self.on_copy_csv).grid(row=0, column=8, padx=6, sticky="e")
+        ttk.Button(header, text="Export CSV", command=self.on_export_csv).grid(row=0, column=9, padx=6, sticky="e")
+        ttk.Button(header, text="Export SQLite", command=self.on_export_sqlite).grid(row=0, column=10, padx=6, sticky="e")
+        ttk.Button(header, text="Clear", command=self.on_clear).grid(row=0, column=11, padx=(6, 0), sticky="e")
         main = ttk.Panedwindow(self, orient=tk.HORIZONTAL)
         main.grid(row=1, column=0, sticky="nsew", padx=10, pady=(0, 10))
         left_frame = ttk.Frame(main, padding=6)
@@ -197,11 +475,12 @@ class JsonToCsvApp(ttk.Frame):
         self.json_text.grid(row=0, column=0, sticky="nsew")
         l_y.grid(row=0, column=1, sticky="ns")
         l_x.grid(row=1, column=0, sticky="ew")
-        ttk.Label(right_frame, text="CSV Output", style="Section.TLabel").grid(
-            row=0, column=0, sticky="w", pady=(0, 6)
-        )
-        rcontainer = ttk.Frame(right_frame)
-        rcontainer.grid(row=1, column=0, sticky="nsew")
+        self.csv_label = ttk.Label(right_frame, text="CSV Output", style="Section.TLabel")
+        self.csv_label.grid(row=0, column=0, sticky="w", pady=(0, 6))
+        self.out_tabs = ttk.Notebook(right_frame)
+        self.out_tabs.grid(row=1, column=0, sticky="nsew")
+        rcontainer = ttk.Frame(self.out_tabs)
+        self.out_tabs.add(rcontainer, text="CSV")
         rcontainer.columnconfigure(0, weight=1)
         rcontainer.rowconfigure(0, weight=1)
         self.csv_text = tk.Text(rcontainer, wrap="none", undo=False, font=self.font_mono, state="normal")
@@ -211,6 +490,11 @@ class JsonToCsvApp(ttk.Frame):
         self.csv_text.grid(row=0, column=0, sticky="nsew")
         r_y.grid(row=0, column=1, sticky="ns")
         r_x.grid(row=1, column=0, sticky="ew")
+        self.grid_view = RowGrid(self.out_tabs)
+        self.out_tabs.add(self.grid_view, text="Grid")
+        self.query_view = QueryConsole(self.out_tabs, self.grid_view)
+        self.out_tabs.add(self.query_view, text="Query")
+        self.out_tabs.bind("<<NotebookTabChanged>>", self._on_tab_changed)
         main.add(left_frame, weight=1)
         main.add(right_frame, weight=1)
         self.status = ttk.Label(self, text="Ready", anchor="w", style="Status.TLabel")
@@ -236,13 +520,14 @@ class JsonToCsvApp(ttk.Frame):
         path = filedialog.askopenfilename(
             title="Import JSON",
             initialdir=self._last_open_dir or "",
-            filetypes=[("JSON files", "*.json;*.ndjson;*.geojson"), ("All files", "*.*")]
+            filetypes=[("JSON files", "*.json;*.ndjson;*.geojson"),
+                       ("Compressed JSON", "*.gz;*.bz2;*.xz;*.zst"), ("All files", "*.*")]
         )
         if not path:
             return
+        import json_io  # file I/O helpers are only needed once a file is picked
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                text = f.read()
+            text = json_io.read_text(path)
         except Exception as e:
             messagebox.showerror("Open Error", f"Failed to open file:\n{e}")
             return
@@ -252,36 +537,49 @@ class JsonToCsvApp(ttk.Frame):
         self._set_status(f"Loaded JSON: {path}")
         self._auto_convert_if_enabled()
     def on_export_csv(self):
-        csv_text = self.csv_text.get("1.0", "end").strip()
-        if not csv_text:
-            left = self.json_text.get("1.0", "end").strip()
-            if not left:
-                self._set_status("Nothing to export.")
-                return
-            try:
-                csv_text = json_to_csv_text(left, sep=self.sep_var.get() or ".")
-                self.csv_text.config(state="normal")
-                self.csv_text.delete("1.0", "end")
-                self.csv_text.insert("1.0", csv_text)
-            except Exception as e:
-                messagebox.showerror("Export Error", f"Cannot export, conversion failed:\n{e}")
-                return
+        text = self.json_text.get("1.0", "end").strip()
+        if not text:
+            self._set_status("Nothing to export.")
+            return
+        if self._export_thread is not None and self._export_thread.is_alive():
+            self._set_status("A CSV export is already running.")
+            return
+        import json_io
         path = filedialog.asksaveasfilename(
             title="Export CSV",
             initialdir=self._last_save_dir or "",
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=json_io.filetypes("CSV files", ".csv")
         )
         if not path:
             return
+        self._last_save_dir = str(path.rsplit("/", 1)[0] if "/" in path else path.rsplit("\\", 1)[0] if "\\" in path else "")
+        sep = self.sep_var.get() or "."
+        self._export_thread = threading.Thread(
+            target=self._export_csv_worker, args=(text, path, sep, self.salvage_var.get()), daemon=True
+        )
+        self._export_thread.start()
+        self._set_status(f"Exporting CSV: {path} ...")
+        self.master.after(100, self._poll_export)
+    def _export_csv_worker(self, text, path, sep, salvage):
+        # Runs off the Tk thread: results are handed back through the queue.
         try:
-            with open(path, "w", encoding="utf-8", newline="") as f:
-                f.write(csv_text)
+            rows = json_to_csv_file(text, path, sep=sep, salvage=salvage)
         except Exception as e:
-            messagebox.showerror("Save Error", f"Failed to save CSV:\n{e}")
+            self._export_queue.put(("error", path, e))
             return
-        self._last_save_dir = str(path.rsplit("/", 1)[0] if "/" in path else path.rsplit("\\", 1)[0] if "\\" in path else "")
-        self._set_status(f"Exported CSV: {path}")
+        self._export_queue.put(("done", path, rows))
+    def _poll_export(self):
+        try:
+            kind, path, result = self._export_queue.get_nowait()
+        except queue.Empty:
+            self.master.after(100, self._poll_export)
+            return
+        if kind == "error":
+            messagebox.showerror("Export Error", f"Failed to export CSV:\n{result}")
+            self._set_status("CSV export failed.")
+            return
+        self._set_status(f"Exported CSV: {path} ({result:,} rows)")
     def on_export_sqlite(self):
         text = self.json_text.get("1.0", "end").strip()
         if not text:
@@ -298,12 +596,19 @@ class JsonToCsvApp(ttk.Frame):
         if not table:
             self._set_status("Export cancelled (no table name).")
             return
+        profiles = []
         try:
-            json_to_sqlite(text, db_path=db_path, table_name=table, sep=self.sep_var.get() or ".")
+            json_to_sqlite(text, db_path=db_path, table_name=table, sep=self.sep_var.get() or ".",
+                           salvage=self.salvage_var.get(), profiles=profiles)
         except Exception as e:
             messagebox.showerror("SQLite Export Error", str(e))
             return
-        self._set_status(f"Exported to SQLite: {db_path} (table '{table}')")
+        status = f"Exported to SQLite: {db_path} (table '{table}')"
+        from json_profile import suggest_indexes
+        indexes = suggest_indexes(profiles)
+        if indexes:
+            status += f"; worth indexing: {', '.join(indexes)}"
+        self._set_status(status)
     def on_paste_json(self):
         try:
             clip = self.master.clipboard_get()
@@ -315,12 +620,19 @@ class JsonToCsvApp(ttk.Frame):
         self._set_status("Pasted JSON from clipboard.")
         self._auto_convert_if_enabled()
     def on_convert(self):
-        text = self.json_text.get("1.0", "end").strip()
+        full = self.json_text.get("1.0", "end")
+        text = full.strip()
+        self.json_text.tag_remove("quarantine", "1.0", "end")
         if not text:
             self._set_status("No JSON to convert.")
             return
         try:
-            csv_out = json_to_csv_text(text, sep=self.sep_var.get() or ".")
+            quarantined = []
+            store = _flatten_json(text, sep=self.sep_var.get() or ".",
+                                  salvage=self.salvage_var.get(), quarantined=quarantined)
+            csv_out, stats = _csv_preview_rows(store)
+            self.grid_view.load(store)
+            self.query_view.load(store)
         except Exception as e:
             messagebox.showerror("Conversion Error", str(e))
             self._set_status("Conversion failed.")
@@ -329,9 +641,31 @@ class JsonToCsvApp(ttk.Frame):
         self.csv_text.delete("1.0", "end")
         self.csv_text.insert("1.0", csv_out)
         self.csv_text.config(state="normal")
-        self._set_status("Converted JSON to CSV.")
+        self._preview_truncated = stats["shown"] < stats["rows"]
+        if self._preview_truncated:
+            self.csv_label.config(
+                text=f"CSV Preview ({stats['shown']:,} of {stats['rows']:,} rows, {stats['columns']:,} columns)"
+            )
+            self._set_status("Converted JSON to CSV (preview). Export CSV writes all rows.")
+        else:
+            self.csv_label.config(text=f"CSV Output ({stats['rows']:,} rows, {stats['columns']:,} columns)")
+            self._set_status("Converted JSON to CSV.")
+        if quarantined:
+            lead = len(full) - len(full.lstrip())
+            for start, end in quarantined:
+                self.json_text.tag_add("quarantine", f"1.0 + {lead + start} chars", f"1.0 + {lead + end} chars")
+            self.json_text.tag_configure("quarantine", background="#D44545")
+            self._set_status(f"Salvaged {stats['rows']:,} rows; skipped {len(quarantined)} corrupt span(s) (highlighted).")
     def on_copy_csv(self):
-        data = self.csv_text.get("1.0", "end").strip()
+        if self._preview_truncated:
+            try:
+                data = json_to_csv_text(self.json_text.get("1.0", "end").strip(), sep=self.sep_var.get() or ".",
+                                        salvage=self.salvage_var.get())
+            except Exception as e:
+                messagebox.showerror("Conversion Error", str(e))
+                return
+        else:
+            data = self.csv_text.get("1.0", "end").strip()
         if not data:
             self._set_status("No CSV to copy.")
             return
@@ -341,14 +675,23 @@ class JsonToCsvApp(ttk.Frame):
     def on_clear(self):
         self.json_text.delete("1.0", "end")
         self.csv_text.delete("1.0", "end")
+        self.csv_label.config(text="CSV Output")
+        self.grid_view.clear()
+        self.query_view.clear()
+        self._preview_truncated = False
         self._set_status("Cleared.")
+    def _on_tab_changed(self, _):
+        if self.out_tabs.select() == str(self.query_view):
+            self.query_view.ensure_staged()
+        elif self.out_tabs.select() == str(self.grid_view):
+            self.grid_view.ensure_staged()
     def _set_status(self, msg):
         self.status.config(text=msg)
 def main():
-    if USING_TTKBS:
-        style = tb.Style(theme="darkly")
-        root = style.master
-    else:
+    try:
+        import ttkbootstrap as tb  # optional theme; slow to import, so only when the app starts
+        root = tb.Style(theme="darkly").master
+    except Exception:
         root = tk.Tk()
     app = JsonToCsvApp(root)
     app.mainloop()
@@ -0,0 +1,343 @@
+"""
+Flattening of JSON records into table rows, and CSV / SQLite output.
+
+The library half of the table converter, shared with the worker daemon.
+Importing it is cheap: the parser backend, the salvage reader, the
+column profiler, sqlite3, csv and tkinter are all imported by the
+functions that need them.
+"""
+import io
+import re
+from itertools import islice
+from operator import itemgetter
+def flatten_dict(d, parent_key="", sep="."):
+    items = []
+    if isinstance(d, dict):
+        for k, v in d.items():
+            new_key = f"{parent_key}{sep}{k}" if parent_key else k
+            items.extend(flatten_dict(v, new_key, sep=sep).items())
+    elif isinstance(d, list):
+        for idx, v in enumerate(d):
+            new_key = f"{parent_key}{sep}{idx}" if parent_key else str(idx)
+            items.extend(flatten_dict(v, new_key, sep=sep).items())
+    else:
+        items.append((parent_key, d))
+    return dict(items)
+def infer_records(obj):
+    if isinstance(obj, list):
+        if all(isinstance(x, dict) for x in obj):
+            return obj
+        return [{"value": x} for x in obj]
+    if isinstance(obj, dict):
+        for v in obj.values():
+            if isinstance(v, list):
+                if all(isinstance(x, dict) for x in v):
+                    return v
+                return [{"value": x} for x in v]
+        return [obj]
+    return [{"value": obj}]
+class RowStore:
+    """
+    Flattened records in compact form, equivalent to running flatten_dict on
+    every record. Each key-path is interned once to an integer column id
+    (walking a trie of raw keys, so no dotted string is rebuilt per record)
+    and each row is a tuple of slots indexed by column id; a row is only as
+    long as the highest column it uses, missing cells read as None.
+    """
+    def __init__(self, sep="."):
+        self.sep = sep
+        self.columns = []  # column id -> key-path
+        self.rows = []
+        self._ids = {}     # key-path -> column id
+        self._trie = {}    # raw key -> [key-path, column id or -1, child trie]
+    def __len__(self):
+        return len(self.rows)
+    def _intern(self, path):
+        cid = self._ids.get(path)
+        if cid is None:
+            cid = self._ids[path] = len(self.columns)
+            self.columns.append(path)
+        return cid
+    def _flatten_into(self, value, node, path, row):
+        sep = self.sep
+        for k, v in (value.items() if isinstance(value, dict) else enumerate(value)):
+            entry = node.get(k)
+            if entry is None:
+                entry = node[k] = [f"{path}{sep}{k}" if path else str(k), -1, None]
+            if isinstance(v, (dict, list)):
+                if entry[2] is None:
+                    entry[2] = {}
+                self._flatten_into(v, entry[2], entry[0], row)
+                continue
+            cid = entry[1]
+            if cid < 0:
+                cid = entry[1] = self._intern(entry[0])
+            if cid >= len(row):
+                row.extend([None] * (cid + 1 - len(row)))
+            row[cid] = v
+    def add(self, record):
+        row = []
+        self._flatten_into(record, self._trie, "", row)
+        self.rows.append(tuple(row))
+    def extend(self, records):
+        for r in records:
+            self.add(r)
+    def sorted_ids(self):
+        return sorted(range(len(self.columns)), key=self.columns.__getitem__)
+    @property
+    def headers(self):
+        return [self.columns[c] for c in self.sorted_ids()]
+    def iter_rows(self, order=None):
+        """Yield every row as a tuple laid out by `order` (column ids, default
+        sorted header order) with None for missing cells."""
+        order = self.sorted_ids() if order is None else list(order)
+        if not order:
+            for _ in self.rows:
+                yield ()
+            return
+        ncols = len(self.columns)
+        get = itemgetter(*order)
+        single = len(order) == 1
+        for row in self.rows:
+            if len(row) < ncols:
+                row = row + (None,) * (ncols - len(row))
+            yield (get(row),) if single else get(row)
+PREVIEW_ROWS = 500
+def _flatten_json(json_text, sep=".", salvage=False, quarantined=None):
+    """
+    Parse and flatten JSON text (a str or a text stream) into a RowStore.
+    With `salvage`, corrupt or truncated input is read with the
+    error-tolerant reader, which consumes a stream incrementally, and the
+    dropped (start, end) spans are appended to `quarantined`.
+    """
+    if salvage:
+        from json_recover import salvage as salvage_json
+        result = salvage_json(json_text)
+        if quarantined is not None:
+            quarantined.extend(result.quarantined)
+        data = result.document
+    else:
+        import json_backend  # pulls in orjson; deferred to the first conversion
+        data = json_backend.loads(json_text if isinstance(json_text, str) else json_text.read())
+    store = RowStore(sep=sep)
+    store.extend(infer_records(data))
+    return store
+def _write_csv_rows(fp, store, limit=None):
+    import csv
+    writer = csv.writer(fp)
+    writer.writerow(store.headers)
+    rows = store.iter_rows()
+    if limit is not None:
+        rows = islice(rows, limit)
+    writer.writerows(rows)
+    return len(store) if limit is None else min(limit, len(store))
+def json_to_csv_text(json_text, sep=".", salvage=False):
+    store = _flatten_json(json_text, sep=sep, salvage=salvage)
+    out = io.StringIO()
+    _write_csv_rows(out, store)
+    return out.getvalue()
+def json_to_csv_file(json_text, path: str, sep=".", salvage=False):
+    """
+    Convert JSON text and write the CSV straight to `path`, row by row,
+    without building the full CSV string in memory (compressed when `path`
+    ends in .gz/.bz2/.xz/.zst). Returns the row count.
+    """
+    import json_io
+    store = _flatten_json(json_text, sep=sep, salvage=salvage)
+    with json_io.open_text(path, "w", newline="") as f:
+        return _write_csv_rows(f, store)
+def json_to_csv_stream(json_text, fp, sep=".", salvage=False):
+    """
+    Convert JSON text and write the CSV row by row to the open text stream
+    `fp` (anything with a write method). Returns stats with "rows" and
+    "columns".
+    """
+    store = _flatten_json(json_text, sep=sep, salvage=salvage)
+    rows = _write_csv_rows(fp, store)
+    return {"rows": rows, "columns": len(store.columns)}
+def csv_preview(json_text, sep=".", max_rows=PREVIEW_ROWS, salvage=False):
+    """
+    Convert JSON text but only render the header and the first `max_rows` rows.
+    Returns (csv_text, stats) where stats has total "rows", "columns" and "shown".
+    """
+    store = _flatten_json(json_text, sep=sep, salvage=salvage)
+    return _csv_preview_rows(store, max_rows=max_rows)
+def _csv_preview_rows(store, max_rows=PREVIEW_ROWS):
+    out = io.StringIO()
+    shown = _write_csv_rows(out, store, limit=max_rows)
+    stats = {"rows": len(store), "columns": len(store.columns), "shown": shown}
+    return out.getvalue(), stats
+_SQL_IDENT_RE = re.compile(r"[^A-Za-z0-9_]")
+def _sql_ident(name: str) -> str:
+    safe = _SQL_IDENT_RE.sub("_", name.strip() or "col")
+    return f"\"{safe}\""
+# Rows transposed at a time by _sql_columns: enough for the per-column work
+# to run in C, few enough that the store is never held a second time.
+SQL_BLOCK_ROWS = 1 << 14
+def _column_blocks(store, order):
+    """The store's columns in `order`, SQL_BLOCK_ROWS rows at a time."""
+    rows = store.iter_rows(order)
+    while True:
+        block = list(islice(rows, SQL_BLOCK_ROWS))
+        if not block:
+            return
+        yield list(zip(*block))
+def _column_values(store, c):
+    for row in store.rows:
+        yield row[c] if c < len(row) else None
+def _converted_rows(store, order, converters):
+    for columns in _column_blocks(store, order):
+        yield from zip(*(col if f is None else map(f, col) for f, col in zip(converters, columns)))
+def _sql_columns(store, order, verify=True):
+    """Quoted column names, a json_profile.ColumnProfile (named like the
+    SQL column) and an iterator over the typed rows for the store's columns
+    in `order`. Names that collide once sanitized get a suffix. Without
+    `verify`, types are only guessed from a sample and every column is
+    declared BLOB."""
+    names, seen = [], set()
+    for c in order:
+        name = base = _sql_ident(store.columns[c])
+        n = 2
+        while name.lower() in seen:  # "a.b" and "a_b" both become "a_b"
+            name = f"{base[:-1]}_{n}\""
+            n += 1
+        seen.add(name.lower())
+        names.append(name)
+    from json_profile import ColumnProfiler, column_converter
+    profilers = [ColumnProfiler(name[1:-1]) for name in names]
+    for columns in _column_blocks(store, order):
+        for profiler, values in zip(profilers, columns):
+            profiler.extend(values)
+    profiles = [profiler.profile(_column_values(store, c) if verify else None)
+                for profiler, c in zip(profilers, order)]
+    # Converted lazily, a block at a time; most columns pass as they are.
+    converters = [column_converter(profile) for profile in profiles]
+    if not any(converters):
+        return names, profiles, store.iter_rows(order)
+    return names, profiles, _converted_rows(store, order, converters)
+def json_to_sqlite(json_text, db_path: str, table_name: str, sep=".", salvage=False, if_exists=None, conn=None,
+                   verify_types=True, create_indexes=False, profiles=None):
+    """Load the flattened rows into `table_name`. When the table exists,
+    `if_exists` ("replace" or "append") decides what happens; None asks the
+    user. Pass an open `conn` to reuse a connection (it is left open).
+
+    Column types come from a profile of each column (json_profile) that
+    checks every value; with `verify_types` off they are only guessed from
+    a sample, and the columns are declared BLOB so SQLite stores every
+    value as it comes. The column profiles are appended
+    to `profiles` when given; `create_indexes` indexes the columns that
+    json_profile.suggest_indexes picks."""
+    store = _flatten_json(json_text, sep=sep, salvage=salvage)
+    if not len(store):
+        raise ValueError("No rows to write.")
+    order = store.sorted_ids()
+    quoted_cols, col_profiles, col_rows = _sql_columns(store, order, verify=verify_types)
+    col_defs = [f"{name} {p.sql_type}" for name, p in zip(quoted_cols, col_profiles)]
+    placeholders = ", ".join(["?"] * len(order))
+    insert_sql = f"INSERT INTO {_sql_ident(table_name)} ({', '.join(quoted_cols)}) VALUES ({placeholders})"
+    own_conn = conn is None
+    if own_conn:
+        import sqlite3
+        conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?;", (table_name,))
+        exists = cur.fetchone() is not None
+        if exists:
+            if if_exists is None:
+                from tkinter import messagebox
+                replace = messagebox.askyesno(
+                    "Table Exists",
+                    f"Table '{table_name}' already exists in:\n{db_path}\n\nReplace it? (Yes = DROP & CREATE, No = append)"
+                )
+            elif if_exists in ("replace", "append"):
+                replace = if_exists == "replace"
+            else:
+                raise ValueError(f"if_exists must be 'replace' or 'append', not {if_exists!r}")
+            if replace:
+                cur.execute(f"DROP TABLE {_sql_ident(table_name)}")
+        if (not exists) or replace:
+            cur.execute(f"CREATE TABLE {_sql_ident(table_name)} ({', '.join(col_defs)})")
+        cur.executemany(insert_sql, col_rows)
+        if create_indexes:
+            from json_profile import suggest_indexes
+            for col in suggest_indexes(col_profiles):
+                cur.execute(f"CREATE INDEX IF NOT EXISTS {_sql_ident(f'ix_{table_name}_{col}')} "
+                            f"ON {_sql_ident(table_name)} ({_sql_ident(col)})")
+        conn.commit()
+    except BaseException:
+        if not own_conn:
+            conn.rollback()
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+    if profiles is not None:
+        profiles.extend(col_profiles)
+    return len(store)
+GRID_TABLE = "grid_rows"
+def stage_rows_sqlite(conn, store, table=GRID_TABLE, view=None):
+    """
+    Load a RowStore into `table` on an open SQLite connection, using
+    positional column names (c0, c1, ...) in sorted header order so header
+    spelling never matters, typed like json_to_sqlite's columns. With
+    `view`, also create a view of that name with the named columns (as
+    json_to_sqlite writes them), so queries need no second copy of the rows.
+    Returns the columns' profiles, in the same order.
+    """
+    names, profiles, rows = _sql_columns(store, store.sorted_ids())
+    cur = conn.cursor()
+    if view:
+        for kind, in cur.execute("SELECT type FROM sqlite_master WHERE name = ?", (view,)).fetchall():
+            cur.execute(f"DROP {kind.upper()} {_sql_ident(view)}")  # a table if a query replaced the view
+    cur.execute(f"DROP TABLE IF EXISTS {_sql_ident(table)}")
+    if not profiles:
+        conn.commit()
+        return []
+    cols = [f"c{i} {p.sql_type}" for i, p in enumerate(profiles)]
+    cur.execute(f"CREATE TABLE {_sql_ident(table)} ({', '.join(cols)})")
+    placeholders = ", ".join(["?"] * len(cols))
+    cur.executemany(f"INSERT INTO {_sql_ident(table)} VALUES ({placeholders})", rows)
+    if view:
+        named = ", ".join(f"c{i} AS {name}" for i, name in enumerate(names))
+        cur.execute(f"CREATE VIEW {_sql_ident(view)} AS SELECT {named} FROM {_sql_ident(table)}")
+    conn.commit()
+    return profiles
+QUERY_TABLE = "data"
+# Tables smaller than this are scanned; indexes only pay off on bigger ones.
+QUERY_INDEX_MIN_ROWS = 10_000
+_SQL_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_SQL_CLAUSE_RE = re.compile(r"\b(?:WHERE|ORDER\s+BY|GROUP\s+BY|JOIN)\b", re.IGNORECASE)
+_SQL_NAME_RE = re.compile(r'"((?:[^"]|"")+)"|\b([A-Za-z_][A-Za-z0-9_]*)\b')
+def stage_query_table(conn, store, table=QUERY_TABLE):
+    """
+    Load a RowStore into `table` with named, typed columns (as json_to_sqlite
+    writes them) for ad-hoc queries. Returns the columns' profiles.
+    """
+    order = store.sorted_ids()
+    names, profiles, rows = _sql_columns(store, order)
+    conn.execute(f"DROP TABLE IF EXISTS {_sql_ident(table)}")
+    if not names:
+        conn.commit()
+        return []
+    conn.execute(f"CREATE TABLE {_sql_ident(table)} ({', '.join(f'{n} {p.sql_type}' for n, p in zip(names, profiles))})")
+    conn.executemany(
+        f"INSERT INTO {_sql_ident(table)} VALUES ({', '.join(['?'] * len(names))})",
+        rows
+    )
+    conn.commit()
+    return profiles
+def index_candidates(sql: str, columns):
+    """Columns named in the WHERE / ORDER BY / GROUP BY / JOIN part of `sql`
+    (string literals ignored), in order of first use."""
+    sql = _SQL_STRING_RE.sub("''", sql)
+    m = _SQL_CLAUSE_RE.search(sql)
+    if not m:
+        return []
+    known = {c.lower(): c for c in columns}
+    found = []
+    for quoted, bare in _SQL_NAME_RE.findall(sql, m.start()):
+        col = known.get((quoted.replace('""', '"') or bare).lower())
+        if col is not None and col not in found:
+            found.append(col)
+    return found
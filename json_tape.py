@@ -0,0 +1,174 @@
+"""
+Compact, read-only view of a JSON document as a flat token tape.
+
+Instead of a graph of dicts and lists, `Tape` keeps the (valid) JSON text
+and two flat integer arrays with one entry per token (value, object key or
+closing bracket):
+
+* offset: where the token starts in the text; its first character tells
+  the kind (quote, bracket, digit, t/f/n);
+* skip: for objects and arrays, the tape index just past their closing
+  bracket, so a whole subtree is stepped over in one move (0 otherwise).
+
+That is 8 bytes per token (16 past 4 GB of text) on top of the text,
+against several times the text size for the parsed object graph. Keys and
+scalars are decoded only when asked for, and whole subtrees are
+materialized on demand (copy value, diff) straight from the text.
+"""
+import json
+import re
+from array import array
+from bisect import bisect_right
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+_DECODER = json.JSONDecoder()
+# Every string, bracket and bare scalar; whitespace, commas and colons are
+# skipped by the regex engine itself.
+_TOKEN_RE = re.compile(r'"[^"\\]*+(?:\\.[^"\\]*+)*+"|[{}\[\]]|[^\s,:"{}\[\]]++')
+_BRACKET_RE = re.compile(r"[{}\[\]]")
+_STRING_RE = re.compile(r'"[^"\\]*+(?:\\.[^"\\]*+)*+"')
+_PATH_RE = re.compile(r'\.([A-Za-z_][A-Za-z0-9_\-]*)|\[(\d+)\]|\[("(?:[^"\\]|\\.)*")\]|\[\'([^\']*)\'\]')
+_KIND_NAMES = {'"': "string", "{": "object", "[": "array", "t": "true", "f": "false", "n": "null"}
+# Kinds are derived from the tokens' first characters this many at a time.
+_KIND_BATCH = 1 << 16
+# Objects with more members than this get a cached key index on lookup.
+_INDEX_THRESHOLD = 32
+class Tape:
+    """Token tape over `text`, which must be valid JSON (validate it first)."""
+    def __init__(self, text: str):
+        self.text = text
+        typecode = "I" if len(text) < 1 << 32 else "q"  # 4 or 8 bytes
+        self.offsets = array(typecode, map(re.Match.start, _TOKEN_RE.finditer(text)))
+        n = len(self.offsets)
+        if not n:
+            raise ValueError("empty JSON document")
+        self.skips = array(typecode, [0]) * n  # no temporary zero buffer
+        self._members: Dict[int, Union[array, Dict[str, int]]] = {}
+        self._link_brackets()
+    def _link_brackets(self):
+        text, offsets, skips = self.text, self.offsets, self.skips
+        stack = []
+        for base in range(0, len(offsets), _KIND_BATCH):
+            chunk = offsets[base:base + _KIND_BATCH]
+            firsts = "".join(itemgetter(*chunk)(text)) if len(chunk) > 1 else text[chunk[0]]
+            for m in _BRACKET_RE.finditer(firsts):
+                i = base + m.start()
+                if m.group() in "{[":
+                    stack.append(i)
+                elif not stack:
+                    raise ValueError(f"unbalanced '{m.group()}' at offset {offsets[i]}")
+                else:
+                    skips[stack.pop()] = i + 1
+        if stack:
+            raise ValueError("incomplete JSON document")
+    def __len__(self) -> int:
+        return len(self.offsets)
+    def nbytes(self) -> int:
+        """Memory used by the tape arrays (the text not included)."""
+        return (len(self.offsets) + len(self.skips)) * self.offsets.itemsize
+    def kind(self, i: int) -> str:
+        """object, array, string, number, true, false or null."""
+        return _KIND_NAMES.get(self.text[self.offsets[i]], "number")
+    def is_container(self, i: int) -> bool:
+        return self.skips[i] != 0
+    def next(self, i: int) -> int:
+        """Tape index of the value after `i` and its subtree."""
+        return self.skips[i] or i + 1
+    def key(self, i: int) -> str:
+        """Decoded object key at tape index `i`."""
+        return _DECODER.raw_decode(self.text, self.offsets[i])[0]
+    def children(self, i: int, start: Optional[int] = None, index: int = 0) -> Iterator[Tuple[Union[str, int], int]]:
+        """(key or index, tape index) of each member of container `i`. To
+        resume part way, pass the tape index `start` of a member (its key,
+        for objects) and its position `index`."""
+        end = self.skips[i] - 1  # the closing bracket
+        j = i + 1 if start is None else start
+        if self.text[self.offsets[i]] == "{":
+            while j < end:
+                yield self.key(j), j + 1
+                j = self.skips[j + 1] or j + 2
+        else:
+            idx = index
+            while j < end:
+                yield idx, j
+                idx += 1
+                j = self.skips[j] or j + 1
+    def child(self, i: int, key: Union[str, int]) -> int:
+        """Tape index of member `key` of container `i`. Raises KeyError or
+        IndexError like the dict or list would."""
+        members = self._members.get(i)
+        if members is None:
+            kind = self.kind(i)
+            if kind == "object":
+                if self.skips[i] - i <= _INDEX_THRESHOLD:
+                    for k, j in self.children(i):
+                        if k == key:
+                            return j
+                    raise KeyError(key)
+                members = self._members[i] = {k: j for k, j in self.children(i)}
+            elif kind == "array" and isinstance(key, int):
+                members = self._members[i] = array(self.offsets.typecode, (j for _, j in self.children(i)))
+            else:
+                raise KeyError(key)
+        if isinstance(members, dict):
+            return members[key]
+        if not isinstance(key, int):
+            raise KeyError(key)
+        return members[key]
+    def child_count(self, i: int) -> int:
+        members = self._members.get(i)
+        if members is not None:
+            return len(members)
+        return sum(1 for _ in self.children(i))
+    def resolve(self, path: str) -> int:
+        """Tape index for a JSONPath such as $.items[3].name or $["a b"]."""
+        i = 0
+        for name, index, quoted, single in _PATH_RE.findall(path):
+            if index:
+                i = self.child(i, int(index))
+            else:
+                i = self.child(i, name or single or json.loads(quoted))
+        return i
+    def span(self, i: int) -> Tuple[int, int]:
+        """(start, end) text offsets of a key or scalar; for an object or
+        array, of the whole value."""
+        start = self.offsets[i]
+        if self.skips[i]:
+            return start, self.offsets[self.skips[i] - 1] + 1
+        return start, _DECODER.raw_decode(self.text, start)[1]
+    def token_at(self, offset: int) -> int:
+        """Tape index of the token starting at or before text `offset`."""
+        return max(bisect_right(self.offsets, offset) - 1, 0)
+    def path_to(self, i: int) -> List[int]:
+        """Tape indices of the values from the root's member down to the one
+        holding token `i` (an object key stands for its value). Subtrees are
+        stepped over, nothing is decoded."""
+        text, offsets, skips = self.text, self.offsets, self.skips
+        path = []
+        node = 0
+        while node != i and skips[node]:
+            end = skips[node] - 1
+            step = 1 if text[offsets[node]] == "{" else 0  # key before each value
+            j = node + 1
+            while j < end:
+                after = skips[j + step] or j + step + 1
+                if i < after:
+                    break
+                j = after
+            else:
+                break  # `i` is this container's closing bracket
+            node = j + step
+            path.append(node)
+            if j == i:
+                break  # the key itself
+        return path
+    def value(self, i: int = 0) -> Any:
+        """Decode value `i` (a whole subtree for containers)."""
+        return _DECODER.raw_decode(self.text, self.offsets[i])[0]
+    def preview(self, i: int, limit: int = 40) -> str:
+        """repr() of a scalar for display; long strings are cut at `limit`
+        characters without decoding the rest."""
+        start = self.offsets[i]
+        if self.text[start] == '"' and _STRING_RE.match(self.text, start, start + limit * 6 + 2) is None:
+            return repr(self.text[start + 1:start + 1 + limit]) + "..."
+        return repr(self.value(i))
@@ -0,0 +1,353 @@
+"""
+Long-running worker for repair / CSV / SQLite jobs, so pipelines pay for
+interpreter start-up and imports once instead of once per file.
+
+    python json_worker.py [--socket PATH] [--workers N]
+
+Without --socket, jobs are read from stdin and results written to stdout.
+Either way the protocol is line-delimited JSON: one request object per line,
+one or more response objects per request, matched by "id". Requests run
+concurrently, so responses may arrive out of order; a client that sends
+a large batch should read responses while it writes.
+
+    {"id": 1, "op": "repair", "text": "{a: None,}"}
+    {"id": 1, "ok": true, "text": "{ \"a\": null}", "report": [...], "ms": 0.4}
+
+Input is "text" or "path"; "sep" and "salvage" mean the same as in the
+table converter. Compressed input files are detected from their content and
+"out" files ending in .gz/.bz2/.xz/.zst are written compressed (json_io);
+with "salvage", csv and sqlite jobs decompress and parse "path" as a stream.
+Ops:
+
+* repair: the repaired text, or written to "out" when given. With "salvage",
+  input that cannot be repaired falls back to the error-tolerant reader.
+  Inputs over PARALLEL_BYTES that hold one top-level array are repaired in
+  chunks across the whole pool (json_repair.repair_array_parallel); the
+  response then also has "chunks", and a failure names the failed chunks.
+* csv: written to "out" when given, otherwise sent back as {"id", "chunk"}
+  lines before the final {"id", "ok", "rows", "columns"}. Past INLINE_BYTES
+  the rows are written in a thread and each chunk is sent as soon as it is
+  full, so the whole CSV is never held in memory.
+* sqlite: loads into "db" / "table" (default "data"); "if_exists" is
+  "append" (default) or "replace". Column types are inferred and checked
+  against every value; "verify": false only samples them (and declares
+  BLOB columns), "indexes" creates the suggested indexes. The response
+  lists each column's "types" and the "indexes" worth having
+  (json_profile.suggest_indexes).
+* ping, stats
+
+Small inputs run inline on the event loop (a pool round-trip costs more than
+the work); larger ones go to a warm ProcessPoolExecutor. Sizes are
+uncompressed (gzip records it); other compressed files always go to the
+pool. SQLite jobs reuse one connection per database file and run one at a
+time per database. Failures come back as {"id", "ok": false, "error"}.
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import json_backend
+import json_io
+import json_repair
+from json_recover import salvage as salvage_json
+from json_profile import suggest_indexes
+from json_tables import csv_preview, json_to_csv_file, json_to_csv_stream, json_to_sqlite
+# Inputs up to this size are processed inline instead of in the process pool.
+INLINE_BYTES = 256 * 1024
+# Repair inputs over this size are split across the pool (unless "salvage").
+PARALLEL_BYTES = 32 << 20
+CSV_CHUNK = 1 << 16
+MAX_LINE = 1 << 28  # longest request line (inline "text" included)
+MAX_CONNECTIONS = 16
+def _read_input(job: Dict[str, Any]) -> str:
+    if "text" in job:
+        return job["text"]
+    if "path" not in job:
+        raise ValueError("job needs 'text' or 'path'")
+    return json_io.read_text(job["path"])
+@contextmanager
+def _open_input(job: Dict[str, Any]):
+    """The job's "text", or its "path" as a (decompressing) text stream."""
+    if "text" in job or "path" not in job:
+        yield _read_input(job)
+        return
+    with json_io.open_text(job["path"]) as f:
+        yield f
+def _input_size(job: Dict[str, Any]) -> Optional[int]:
+    """Uncompressed size of the job's input, or None for compressed files
+    that do not record it (bz2, xz, zstd)."""
+    if "text" in job:
+        return len(job["text"])
+    try:
+        path = job["path"]
+        size = os.path.getsize(path)
+        codec = json_io.detect_compression(path)
+        if codec is None:
+            return size
+        if codec == "gzip":
+            with open(path, "rb") as f:
+                f.seek(-4, os.SEEK_END)
+                # ISIZE: uncompressed length mod 2**32 (of the last member)
+                return max(size, int.from_bytes(f.read(4), "little"))
+        return None
+    except (KeyError, OSError):
+        return 0  # let the job itself report the problem
+def run_repair(job: Dict[str, Any]) -> Dict[str, Any]:
+    text = _read_input(job)
+    repaired, report = json_repair.repair_pipeline(text.strip())
+    quarantined = []
+    if repaired is None and job.get("salvage"):
+        result = salvage_json(text)
+        if result.records:
+            repaired = json_backend.dumps(result.document, indent=2)
+            quarantined = result.quarantined
+            report = [f"salvaged {len(result.records)} record(s), quarantined {len(quarantined)} span(s)"]
+    if repaired is None:
+        error = json_repair.parse_error(text)
+        if error:
+            raise ValueError(f"{error.msg} (line {error.lineno}, col {error.colno})")
+        raise ValueError("could not repair input")
+    return _repair_result(job, repaired, report, quarantined)
+def run_repair_chunked(job: Dict[str, Any], executor) -> Dict[str, Any]:
+    repaired, chunks = json_repair.repair_array_parallel(_read_input(job), executor=executor)
+    failed = [c for c in chunks if c.error]
+    if failed:
+        detail = "; ".join(f"chunk {c.index} [{c.start}:{c.end}]: {c.error}" for c in failed[:5])
+        raise ValueError(f"{len(failed)} of {len(chunks)} chunk(s) could not be repaired: {detail}")
+    report = list(dict.fromkeys(step for c in chunks for step in c.report)) or ["already valid"]
+    result = _repair_result(job, repaired, report)
+    result["chunks"] = len(chunks)
+    return result
+def _repair_result(job, repaired, report, quarantined=()):
+    result = {"report": report}
+    if quarantined:
+        result["quarantined"] = quarantined
+    if job.get("out"):
+        with json_io.open_text(job["out"], "w") as f:
+            f.write(repaired)
+        result["out"] = job["out"]
+    else:
+        result["text"] = repaired
+    return result
+class _ChunkWriter:
+    """Text stream that hands what is written to `emit` in pieces of about
+    CSV_CHUNK characters."""
+    def __init__(self, emit: Callable[[str], None]):
+        self.emit = emit
+        self.parts = []
+        self.size = 0
+    def write(self, s: str) -> int:
+        self.parts.append(s)
+        self.size += len(s)
+        if self.size >= CSV_CHUNK:
+            self.flush()
+        return len(s)
+    def flush(self):
+        if self.parts:
+            self.emit("".join(self.parts))
+            self.parts, self.size = [], 0
+def run_csv(job: Dict[str, Any], emit: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """With `emit`, the CSV goes to it chunk by chunk instead of into the result."""
+    sep = job.get("sep") or "."
+    salvage = bool(job.get("salvage"))
+    with _open_input(job) as source:
+        if job.get("out"):
+            rows = json_to_csv_file(source, job["out"], sep=sep, salvage=salvage)
+            return {"rows": rows, "out": job["out"]}
+        if emit is not None:
+            out = _ChunkWriter(emit)
+            stats = json_to_csv_stream(source, out, sep=sep, salvage=salvage)
+            out.flush()
+            return {"rows": stats["rows"], "columns": stats["columns"]}
+        csv_text, stats = csv_preview(source, sep=sep, max_rows=None, salvage=salvage)
+    return {"rows": stats["rows"], "columns": stats["columns"], "csv": csv_text}
+_POOL_OPS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {"repair": run_repair, "csv": run_csv}
+class SqlitePool:
+    """One open connection per database file (least recently used closed
+    first), each guarded by a lock so jobs on one database run in turn."""
+    def __init__(self, size: int = MAX_CONNECTIONS):
+        self.size = size
+        self._conns: "OrderedDict[str, tuple]" = OrderedDict()
+    def acquire(self, db_path: str):
+        key = os.path.abspath(db_path)
+        entry = self._conns.get(key)
+        if entry is None:
+            conn = sqlite3.connect(key, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            entry = self._conns[key] = (conn, asyncio.Lock())
+            while len(self._conns) > self.size:
+                _, (old, lock) = next(iter(self._conns.items()))
+                if lock.locked():
+                    break
+                self._conns.popitem(last=False)
+                old.close()
+        self._conns.move_to_end(key)
+        return entry
+    def __len__(self):
+        return len(self._conns)
+    def close(self):
+        for conn, _ in self._conns.values():
+            conn.close()
+        self._conns.clear()
+class Worker:
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = (workers or os.cpu_count() or 1) if workers != 0 else 0
+        self.pool = ProcessPoolExecutor(self.workers) if self.workers else None
+        self.sqlite = SqlitePool()
+        self.started = time.time()
+        self.counts = {"inline": 0, "pool": 0, "streamed": 0, "sqlite": 0, "failed": 0}
+    async def warm(self):
+        """Start every pool process now rather than on the first big job."""
+        if self.pool is not None:
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(self.pool, os.getpid)
+                                   for _ in range(self.workers)))
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+        self.sqlite.close()
+    async def run(self, job: Dict[str, Any], send):
+        op = job.get("op")
+        if op == "ping":
+            return {"pid": os.getpid()}
+        if op == "stats":
+            return dict(self.counts, uptime=round(time.time() - self.started, 1),
+                        workers=self.workers, connections=len(self.sqlite))
+        loop = asyncio.get_running_loop()
+        if op == "sqlite":
+            if not job.get("db"):
+                raise ValueError("sqlite job needs 'db'")
+            conn, lock = self.sqlite.acquire(job["db"])
+            profiles = []
+            async with lock:
+                rows = await loop.run_in_executor(None, self._load_sqlite, job, conn, profiles)
+            self.counts["sqlite"] += 1
+            return {"rows": rows, "db": job["db"], "table": job.get("table") or "data",
+                    "types": {p.name: p.sql_type for p in profiles}, "indexes": suggest_indexes(profiles)}
+        fn = _POOL_OPS.get(op)
+        if fn is None:
+            raise ValueError(f"unknown op {op!r}")
+        size = _input_size(job)
+        if op == "csv" and not job.get("out") and (size is None or size > INLINE_BYTES):
+            def emit(chunk):  # runs in the executor thread; waits until the chunk is written
+                asyncio.run_coroutine_threadsafe(send({"id": job.get("id"), "chunk": chunk}), loop).result()
+            self.counts["streamed"] += 1
+            return await loop.run_in_executor(None, run_csv, job, emit)
+        if op == "repair" and self.pool is not None and size is not None and size > PARALLEL_BYTES \
+                and not job.get("salvage"):
+            self.counts["pool"] += 1
+            result = await loop.run_in_executor(None, run_repair_chunked, job, self.pool)
+        elif self.pool is None or size is not None and size <= INLINE_BYTES:
+            self.counts["inline"] += 1
+            result = fn(job)
+        else:
+            self.counts["pool"] += 1
+            result = await loop.run_in_executor(self.pool, fn, job)
+        csv_text = result.pop("csv", None)
+        if csv_text is not None:
+            for i in range(0, len(csv_text), CSV_CHUNK):
+                await send({"id": job.get("id"), "chunk": csv_text[i:i + CSV_CHUNK]})
+        return result
+    @staticmethod
+    def _load_sqlite(job, conn, profiles):
+        with _open_input(job) as source:
+            return json_to_sqlite(source, db_path=job["db"], table_name=job.get("table") or "data",
+                                  sep=job.get("sep") or ".", salvage=bool(job.get("salvage")),
+                                  if_exists=job.get("if_exists") or "append", conn=conn,
+                                  verify_types=bool(job.get("verify", True)), create_indexes=bool(job.get("indexes")),
+                                  profiles=profiles)
+    async def handle(self, line: bytes, send):
+        started = time.perf_counter()
+        job_id = None
+        try:
+            job = json_backend.loads(line)
+            if not isinstance(job, dict):
+                raise ValueError("request must be a JSON object")
+            job_id = job.get("id")
+            result = await self.run(job, send)
+            response = {"id": job_id, "ok": True}
+            response.update(result)
+        except Exception as e:
+            self.counts["failed"] += 1
+            response = {"id": job_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+        response["ms"] = round((time.perf_counter() - started) * 1000, 2)
+        await send(response)
+    async def serve(self, readline, write):
+        """Answer every request line returned by `readline` until it returns
+        b"" (end of input); `write` sends one encoded response line."""
+        async def send(obj):
+            # One write per response line, so concurrent jobs never interleave.
+            await write(json_backend.dumps(obj, compact=True).encode("utf-8", "surrogatepass") + b"\n")
+        tasks = set()
+        while True:
+            line = await readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            task = asyncio.create_task(self.handle(line, send))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        async def write(data: bytes):
+            writer.write(data)
+            await writer.drain()
+        try:
+            await self.serve(reader.readline, write)
+        except (ConnectionError, ValueError) as e:  # ValueError: line over MAX_LINE
+            print(f"json_worker: connection dropped: {e}", file=sys.stderr)
+        finally:
+            writer.close()
+async def _serve_stdio(worker: Worker):
+    # Blocking reads in a thread work for pipes, files and terminals alike.
+    loop = asyncio.get_running_loop()
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+    async def readline():
+        return await loop.run_in_executor(None, stdin.readline)
+    async def write(data: bytes):
+        stdout.write(data)
+        stdout.flush()
+    await worker.serve(readline, write)
+async def _serve_socket(worker: Worker, path: str):
+    if os.path.exists(path):
+        os.unlink(path)  # stale socket from an earlier run
+    server = await asyncio.start_unix_server(worker.serve_connection, path, limit=MAX_LINE)
+    print(f"json_worker: listening on {path}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if os.path.exists(path):
+            os.unlink(path)
+async def _main(args):
+    worker = Worker(args.workers)
+    try:
+        await worker.warm()
+        if args.socket:
+            await _serve_socket(worker, args.socket)
+        else:
+            await _serve_stdio(worker)
+    finally:
+        worker.close()
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serve repair/CSV/SQLite jobs over stdio or a Unix socket.")
+    parser.add_argument("--socket", help="listen on this Unix socket path instead of stdio")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="process pool size for large inputs (default: CPU count, 0 = no pool)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+import json_diff
+from json_diff import Change
+def test_object_key_order_is_not_a_change():
+    a = {"a": 1, "b": [1, 2], "c": {"x": None, "y": "z"}}
+    b = {"c": {"y": "z", "x": None}, "b": [1, 2], "a": 1}
+    assert json_diff.diff(a, b) == []
+def test_array_insert_is_one_addition():
+    a = [{"id": i, "tags": [i, i + 1]} for i in range(500)]
+    b = a[:250] + [{"id": -1}] + a[250:]
+    assert json_diff.diff(a, b) == [Change("added", "$[250]", None, {"id": -1})]
+    assert json_diff.diff(b, a) == [Change("removed", "$[250]", {"id": -1}, None)]
+def test_array_reorder_moves_one_element():
+    a = [{"id": 1}, {"id": 2}, {"id": 3}]
+    b = [{"id": 3}, {"id": 1}, {"id": 2}]
+    assert json_diff.diff(a, b) == [Change("added", "$[0]", None, {"id": 3}),
+                                    Change("removed", "$[2]", {"id": 3}, None)]
+def test_type_changes():
+    a = {"n": 1, "flag": True, "f": 1, "obj": {"z": [1]}, "list": [1]}
+    b = {"n": "1", "flag": 1, "f": 1.0, "obj": [1], "list": {"0": 1}}
+    assert json_diff.diff(a, b) == [
+        Change("changed", "$.n", 1, "1"),
+        Change("changed", "$.flag", True, 1),
+        Change("changed", "$.f", 1, 1.0),
+        Change("changed", "$.obj", {"z": [1]}, [1]),
+        Change("changed", "$.list", [1], {"0": 1}),
+    ]
+def test_nested_paths():
+    a = {"items": [{"name": "a", "odd key": 1}]}
+    b = {"items": [{"name": "b", "odd key": 2, "new": None}]}
+    assert json_diff.diff(a, b) == [
+        Change("changed", "$.items[0].name", "a", "b"),
+        Change("changed", '$.items[0]["odd key"]', 1, 2),
+        Change("added", "$.items[0].new", None, None),
+    ]
@@ -0,0 +1,61 @@
+import pytest
+from json_profile import ColumnProfiler, classify, column_converter, widen
+@pytest.mark.parametrize("a, b, kind", [
+    (None, "integer", "integer"),
+    ("integer", "real", "real"),
+    ("boolean", "integer", "integer"),
+    ("integer_str", "real", "real_str"),
+    ("date", "datetime", "datetime"),
+    ("integer", "date", "text"),
+    ("json", "text", "text"),
+])
+def test_widen(a, b, kind):
+    assert widen(a, b) == kind
+    if a is not None:
+        assert widen(b, a) == kind
+@pytest.mark.parametrize("value, kind", [
+    (True, "boolean"), (3, "integer"), (0.5, "real"), ("42", "integer_str"), ("00501", "text"),
+    ("1.5", "real_str"), ("1.10", "text"), ("false", "boolean_str"), ("2020-02-29", "date"),
+    ("2020-02-29T10:00:00Z", "datetime"), ('{"a": 1}', "json"), ("[oops", "text"),
+])
+def test_classify(value, kind):
+    assert classify(value) == kind
+def _profile(values, sample_size=10, batch=100):
+    profiler = ColumnProfiler("c", sample_size=sample_size)
+    for i in range(0, len(values), batch):
+        profiler.extend(values[i:i + batch])
+    return profiler.profile(values)
+def test_verification_widens_past_the_sample():
+    values = list(range(1000)) + [0.5]
+    profile = _profile(values)
+    assert (profile.kind, profile.sql_type, profile.verified) == ("real", "REAL", True)
+    assert (profile.minimum, profile.maximum) == (0, 999)
+def test_numeric_strings_widen_to_text():
+    values = [str(i) for i in range(1000)] + ["x"]
+    profile = _profile(values)
+    assert (profile.kind, profile.sql_type) == ("text", "TEXT")
+    assert column_converter(profile) is None
+def test_numeric_strings_are_converted():
+    values = [str(i) for i in range(1000)] + ["", None, "1.5"]
+    profile = _profile(values)
+    assert (profile.kind, profile.sql_type) == ("real_str", "REAL")
+    assert (profile.nulls, profile.blanks) == (2, 1)
+    assert (profile.minimum, profile.maximum) == (0, 999)
+    convert = column_converter(profile)
+    assert [convert(v) for v in ("7", "", None, "1.5")] == [7, None, None, 1.5]
+def test_dates_widen_to_datetime():
+    profile = _profile(["2020-01-01"] * 50 + ["2020-01-01T10:00"])
+    assert (profile.kind, profile.sql_type) == ("datetime", "DATETIME")
+def test_unverified_is_blob():
+    profiler = ColumnProfiler("c")
+    profiler.extend([1, 2, 3])
+    profile = profiler.profile()
+    assert (profile.kind, profile.sql_type, profile.verified) == ("integer", "BLOB", False)
+def test_mixed_strings_and_numbers_are_blob():
+    profile = _profile([1, "a", 2])
+    assert (profile.kind, profile.sql_type) == ("text", "BLOB")
+def test_counts_across_batches():
+    values = [i % 7 for i in range(10_000)] + [None] * 5
+    profile = _profile(values, sample_size=50, batch=333)
+    assert (profile.count, profile.nulls, profile.distinct, profile.distinct_capped) == (10_005, 5, 7, False)
+    assert profile.sampled == 50
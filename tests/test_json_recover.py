@@ -0,0 +1,35 @@
+import io
+import json_recover
+def _every_chunk_size(text):
+    """salvage() with chunk boundaries at every possible offset agrees with
+    reading the text in one go."""
+    whole = json_recover.salvage(text)
+    for size in range(1, len(text) + 1):
+        assert json_recover.salvage(io.StringIO(text), chunk_size=size) == whole
+    return whole
+def test_truncated_array_is_closed():
+    result = _every_chunk_size('[{"a": 1}, {"a": 2}, {"a": [3, 4')
+    assert result.records == [{"a": 1}, {"a": 2}, {"a": [3, 4]}]
+    assert result.quarantined == []
+    assert result.mode == "array"
+def test_truncated_inside_string():
+    result = _every_chunk_size('[{"a": "x, ]"}, {"a": "unterminated, ]')
+    assert result.records[0] == {"a": "x, ]"}
+    assert len(result.records) <= 2
+def test_corrupt_element_is_quarantined():
+    text = '[{"a": 1}, {"a" 2}, {"a": 3}]'
+    result = _every_chunk_size(text)
+    assert result.records == [{"a": 1}, {"a": 3}]
+    (start, end), = result.quarantined
+    assert text[start:end] == '{"a" 2}'
+def test_stream_skips_bad_line():
+    result = _every_chunk_size('{"a": 1}\n{"a" 1}\n{"b": 2}\n')
+    assert result.mode == "stream"
+    assert result.records == [{"a": 1}, {"b": 2}]
+    assert len(result.quarantined) == 1
+def test_single_document():
+    result = _every_chunk_size('{"a": [1, 2]}')
+    assert result.document == {"a": [1, 2]}
+def test_close_truncated():
+    assert json_recover.close_truncated('{"a": [1, 2], "b": {"c": 3') == ({"a": [1, 2], "b": {"c": 3}}, 26)
+    assert json_recover.close_truncated('{"a"') is None
@@ -0,0 +1,57 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+import json_repair
+def _elements(text, spans):
+    """Parses every span as an array of its own and joins the elements."""
+    return [x for a, b in spans for x in json.loads("[" + text[a:b] + "]")]
+def test_split_scalar_array():
+    text = json.dumps(list(range(3000)))
+    spans = json_repair.split_array(text, 500)
+    assert len(spans) > 5
+    assert _elements(text, spans) == list(range(3000))
+    assert all(b - a < 520 for a, b in spans)
+def test_split_mixed_array():
+    items = [i if i % 3 else {"id": i, "tags": [i, i + 1]} for i in range(2000)]
+    text = json.dumps(items)
+    spans = json_repair.split_array(text, 300)
+    assert len(spans) > 5
+    assert _elements(text, spans) == items
+def test_split_skips_commas_and_brackets_in_strings():
+    items = ["a, b]", "[x, {y}]", 'q"u,o]te'] * 400
+    text = json.dumps(items)
+    spans = json_repair.split_array(text, 200)
+    assert len(spans) > 5
+    assert _elements(text, spans) == items
+def test_split_single_quotes_and_comments():
+    text = "[" + ", ".join("'a, ]' /* , ] */" for _ in range(500)) + "]"
+    spans = json_repair.split_array(text, 100)
+    assert len(spans) > 5
+    assert all(text[a:b].count("'") % 2 == 0 for a, b in spans)
+def test_split_not_an_array():
+    assert json_repair.split_array('{"a": [1, 2]}') is None
+    assert json_repair.split_array("[1, 2] [3]") is None
+def test_split_unterminated_array():
+    spans = json_repair.split_array("[1, 2, 3", 1)
+    assert spans[-1][1] == len("[1, 2, 3")
+def test_repair_array_parallel_isolates_failures():
+    text = "[" + ", ".join("True" for _ in range(300)) + ", @oops, " + ", ".join("None" for _ in range(300)) + "]"
+    with ThreadPoolExecutor(2) as pool:
+        repaired, reports = json_repair.repair_array_parallel(text, chunk_chars=200, executor=pool, drop_failed=True)
+    assert len(reports) > 2
+    assert sum(1 for r in reports if r.error) == 1
+    values = json.loads(repaired)
+    assert set(values) == {True, None}
+def test_scan_error_matches_parse_error(monkeypatch):
+    monkeypatch.setattr(json_repair, "SCAN_CHUNK_CHARS", 3)
+    for text in ("[1, 2, 3]", "[1, 2,]", "[1,, 2]", "[1, 2", "[1] x", "[]", '[ 1, "a,]" ] ',
+                 "['a']", '[{"a": 1}, {"a": }]', '{"a": [1, 2,]}', ""):
+        expected, got = json_repair.parse_error(text), json_repair.scan_error(text)
+        assert (got and (got.msg, got.pos)) == (expected and (expected.msg, expected.pos)), text
+def test_repair_pipeline_parses_once():
+    parsed = []
+    repaired, report = json_repair.repair_pipeline("{a: True, 'b': None,}", parsed)
+    assert json.loads(repaired) == parsed[0] == {"a": True, "b": None}
+    assert "quoted unquoted keys" in report
+    parsed = []
+    assert json_repair.repair_pipeline("[1, 2,]", parsed, check=json_repair.scan_error)[0] == "[1, 2]"
+    assert parsed == []
@@ -0,0 +1,52 @@
+import json
+import pytest
+from json_tape import Tape
+DOC = {
+    "items": [{"id": 1, "name": "a", "tags": ["x", "y"]}, {"id": 2, "name": "b\"q", "tags": []}],
+    "odd key": {"nested": [1.5, None, True, False, {"deep": "v"}]},
+    "n": -3e-2,
+    "empty": {},
+}
+def _paths(value, path="$"):
+    """Every (JSONPath, value) pair in the document."""
+    yield path, value
+    if isinstance(value, dict):
+        for k, v in value.items():
+            yield from _paths(v, f"{path}.{k}" if k.isidentifier() else f"{path}[{json.dumps(k)}]")
+    elif isinstance(value, list):
+        for i, v in enumerate(value):
+            yield from _paths(v, f"{path}[{i}]")
+@pytest.fixture(params=[None, 2])
+def tape(request):
+    return Tape(json.dumps(DOC, indent=request.param))
+def test_resolve_value_round_trip(tape):
+    for path, value in _paths(DOC):
+        assert tape.value(tape.resolve(path)) == value, path
+def test_resolve_missing(tape):
+    with pytest.raises(KeyError):
+        tape.resolve("$.nope")
+    with pytest.raises(IndexError):
+        tape.resolve("$.items[5]")
+def test_path_to_round_trip(tape):
+    for path, value in _paths(DOC):
+        i = tape.resolve(path)
+        chain = tape.path_to(i)
+        assert chain[-1:] == ([i] if i else [])
+        assert all(tape.is_container(j) for j in chain[:-1])
+        start, end = tape.span(i)
+        assert json.loads(tape.text[start:end]) == value
+        assert tape.token_at(start) == i
+def test_path_to_key_stands_for_value(tape):
+    i = tape.resolve("$.items[1].name")
+    assert tape.key(i - 1) == "name"
+    assert tape.path_to(i - 1)[-1] == i
+def test_children_and_count(tape):
+    items = tape.resolve("$.items")
+    assert tape.child_count(items) == 2
+    assert [k for k, _ in tape.children(tape.resolve("$.items[0]"))] == ["id", "name", "tags"]
+    assert tape.next(items) == tape.resolve('$["odd key"]') - 1
+def test_invalid_brackets():
+    with pytest.raises(ValueError):
+        Tape("[1, 2")
+    with pytest.raises(ValueError):
+        Tape("]")